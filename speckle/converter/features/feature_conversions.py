@@ -1,14 +1,11 @@
-from datetime import datetime
 import inspect
 import math
-import os
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
 
 import numpy as np
 import hashlib
 
 import scipy as sp
-from plugin_utils.helpers import findOrCreatePath
 from speckle.converter.features.GisFeature import GisFeature
 from speckle.converter.geometry import transform
 from speckle.converter.geometry.conversions import (
@@ -17,16 +14,25 @@ from speckle.converter.geometry.conversions import (
     convertToSpeckle,
 )
 from speckle.converter.geometry.mesh import constructMeshFromRaster
-from speckle.converter.geometry.utils import apply_pt_offsets_rotation_on_send
+from speckle.converter.geometry.utils import (
+    apply_offsets_rotation_on_send_array,
+    apply_pt_offsets_rotation_on_send,
+)
+from speckle.converter.layers.ElevationSampler import (
+    ElevationSampler,
+    getElevationSampler,
+)
+from speckle.converter.layers.RasterBandPool import RasterBandPool
 from speckle.converter.layers.utils import (
+    encodeRasterBandValues,
     generate_qgis_app_id,
-    getArrayIndicesFromXY,
+    getArrayIndicesFromXYArrays,
     getElevationLayer,
-    getRasterArrays,
+    getRasterLayerLod,
+    getRasterLayerSimplifyTolerance,
+    getRasterLayerTransformOptions,
     getVariantFromValue,
-    getXYofArrayPoint,
     isAppliedLayerTransformByKeywords,
-    validateAttributeName,
 )
 from speckle.utils.panel_logging import logToUser
 from speckle.converter.features.utils import updateFeat
@@ -45,7 +51,6 @@ try:
         Qgis,
         QgsPointXY,
         QgsGeometry,
-        QgsRasterBandStats,
         QgsFeature,
         QgsFields,
         QgsField,
@@ -63,13 +68,39 @@ try:
 except ModuleNotFoundError:
     pass
 
+# raster mesh: merge corners of neighbouring pixels into a shared vertex grid,
+# vertices are only split where the pixel colors (or heights) differ;
+# can be turned off per layer with the "Separate pixel vertices" transform option
+RASTER_MESH_SHARED_VERTICES = True
+# shared vertex grid is only built if at least this share of pixels repeat the color
+# of the previous pixel in the row (e.g. not for orthophotos with unique pixel colors)
+RASTER_MESH_SHARED_MIN_REPEAT = 0.25
+# raster mesh: skip fully transparent pixels (NoData, outside of elevation layer);
+# can be turned off per layer with the "Keep NoData pixels" transform option
+RASTER_MESH_SKIP_NODATA = True
+# raster conversion is done in strips of full rows, this many pixels per strip;
+# each strip is read separately from GDAL and converted into its own Mesh.
+# Only the working arrays are bounded by the strip size: the sent band values
+# and the strip meshes are kept for the whole raster
+RASTER_TILE_SIZE = 250000
+# conversion progress is reported in steps of this many percent
+RASTER_PROGRESS_STEP = 10
+# extra rows of elevation around a strip, so that smoothing has no seams;
+# NoData heights are interpolated within the strip and its halo rows only,
+# so long NoData gaps can be filled differently at the strip borders
+RASTER_TILE_HALO_ROWS = 5
+# raster band values are sent as compressed chunks of their native type only with
+# the "Compact band values" transform option, as older plugin versions and other
+# connectors only read the "@(10000)<band>_values" lists
+
 
 def featureToSpeckle(
-    fieldnames: List[str],
+    attributesPlan: List[Tuple[int, str, Any]],
     f: "QgsFeature",
     geomType,
     selectedLayer: Union["QgsVectorLayer", "QgsRasterLayer"],
     dataStorage,
+    xform: Union["QgsCoordinateTransform", None] = None,
 ):
     if dataStorage is None:
         return
@@ -88,7 +119,9 @@ def featureToSpeckle(
             # Try to extract geometry
             skipped_msg = f"'{geomType}' feature skipped due to invalid geometry"
             try:
-                geom, iterations = convertToSpeckle(f, selectedLayer, dataStorage)
+                geom, iterations = convertToSpeckle(
+                    f, selectedLayer, dataStorage, xform
+                )
 
                 if geom is not None and geom != "None":
                     if not isinstance(geom.geometry, List):
@@ -160,20 +193,9 @@ def featureToSpeckle(
                 )
 
         attributes = Base()
-        for name in fieldnames:
-            corrected = validateAttributeName(name, fieldnames)
-            f_val = f[name]
-            if f_val == "NULL" or f_val is None or str(f_val) == "NULL":
-                f_val = None
-            if isinstance(f[name], list):
-                x = ""
-                for i, attr in enumerate(f[name]):
-                    if i == 0:
-                        x += str(attr)
-                    else:
-                        x += ", " + str(attr)
-                f_val = x
-            attributes[corrected] = f_val
+        values = f.attributes()
+        for index, corrected, convert in attributesPlan:
+            attributes[corrected] = convert(values[index])
 
         # if geom is not None and geom!="None":
         geom.attributes = attributes
@@ -195,42 +217,61 @@ def featureToSpeckle(
 
 def show_progress(current_row: int, rows: int, layer_name: str, plugin: "SpeckleQGIS"):
     """Updates UI with raster conversion %."""
-    percentage: int = int(current_row / rows)  # i = percentage
-    if percentage % 10 == 0 or percentage == 5:
-        logToUser(
-            f"Converting layer '{layer_name}': {percentage}%...",
-            level=0,
-            plugin=plugin.dockwidget,
-        )
+    percentage: int = int(100 * current_row / rows)
+    logToUser(
+        f"Converting layer '{layer_name}': {percentage}%...",
+        level=0,
+        plugin=plugin.dockwidget,
+    )
 
 
-def reproject_raster(layer, crs, resolutionX, resolutionY):
-    if layer.crs() == crs:
-        return layer
-    path = (
-        os.path.expandvars(r"%LOCALAPPDATA%")
-        + "\\Temp\\Speckle_QGIS_temp\\"
-        + datetime.now().strftime("%Y-%m-%d_%H-%M")
-    )
-    findOrCreatePath(path)
-
-    out = path + "\\out.tif"
-    file = gdal.Warp(
-        out,
-        layer.source(),
-        dstSRS=crs.authid(),
-        xRes=resolutionX,
-        yRes=resolutionY,
+def get_raster_tile_rows(columns: int) -> int:
+    """Returns the number of raster rows converted at once."""
+    return max(1, int(RASTER_TILE_SIZE / max(1, columns)))
+
+
+def get_raster_lod_dataset(ds, source: str, max_cells, resample_alg: str = "average"):
+    """Returns a raster dataset of at most max_cells pixels (closest overview or resampled copy), its temporary path if created and its open options."""
+    if max_cells is None or ds.RasterXSize * ds.RasterYSize <= max_cells:
+        return ds, None, []
+
+    # use the most detailed overview that fits, if available
+    band = ds.GetRasterBand(1)
+    overview_level = None
+    overview_cells = 0
+    for level in range(band.GetOverviewCount()):
+        overview = band.GetOverview(level)
+        cells = overview.XSize * overview.YSize
+        if overview_cells < cells <= max_cells:
+            overview_level, overview_cells = level, cells
+    if overview_level is not None:
+        open_options = [f"OVERVIEW_LEVEL={overview_level}"]
+        ds_overview = gdal.OpenEx(
+            source, gdal.OF_RASTER | gdal.OF_READONLY, open_options=open_options
+        )
+        if ds_overview is not None:
+            return ds_overview, None, open_options
+
+    factor = math.sqrt(ds.RasterXSize * ds.RasterYSize / max_cells)
+    path = f"/vsimem/speckle_raster_lod_{id(ds)}.tif"
+    ds_resampled = gdal.Translate(
+        path,
+        ds,
+        width=max(1, int(ds.RasterXSize / factor)),
+        height=max(1, int(ds.RasterYSize / factor)),
+        resampleAlg=resample_alg,
     )
-    return QgsRasterLayer(out, "", "gdal")
+    return ds_resampled, path, []
 
 
 def get_raster_mesh_coords(
     reprojected_raster_stats,
     rasterResXY: list,
-    band1_values: list,
+    band1_values,
     dataStorage,
-) -> List[float]:
+    row_offset: int = 0,
+) -> np.ndarray:
+    """Returns a flat array of quad vertices, 4 per pixel, built from the raster grid (starting from the given row)."""
     (
         reprojected_top_right,
         reprojectedOriginPt,
@@ -246,53 +287,270 @@ def get_raster_mesh_coords(
     x_correction = (reprojected_bottom_left.x() - xOrigin) / sizeX
     y_correction = (reprojected_top_right.y() - yOrigin) / rasterDimensions[1]
 
-    list_nested = [
-        (
-            xOrigin
-            + rasterResXY[0]
-            * (ind % sizeX)  # ind%sizeX = current item index in the row; +1 = next item
-            + x_correction * (ind % sizeX),
-            yOrigin
-            + rasterResXY[1]
-            * math.floor(
-                ind / sizeX
-            )  # math.floor(ind/sizeX) = current row index; +1 = next row
-            + y_correction * math.floor(ind / sizeX),
-            0,
-            xOrigin + rasterResXY[0] * (ind % sizeX) + x_correction * (ind % sizeX),
-            yOrigin
-            + rasterResXY[1] * math.floor(ind / sizeX + 1)
-            + y_correction * math.floor(ind / sizeX + 1),
-            0,
-            xOrigin
-            + rasterResXY[0] * (ind % sizeX + 1)
-            + x_correction * (ind % sizeX + 1),
-            yOrigin
-            + rasterResXY[1] * math.floor(ind / sizeX + 1)
-            + y_correction * math.floor(ind / sizeX + 1),
-            0,
-            xOrigin
-            + rasterResXY[0] * (ind % sizeX + 1)
-            + x_correction * (ind % sizeX + 1),
-            yOrigin
-            + rasterResXY[1] * math.floor(ind / sizeX)
-            + y_correction * math.floor(ind / sizeX),
-            0,
-        )
-        for ind, _ in enumerate(band1_values)
-    ]
-    list_flattened = [item for sublist in list_nested for item in sublist]
+    count = len(band1_values)
+    rows = math.ceil(count / sizeX)
+
+    # coordinates of the grid lines, shared by the neighbouring pixels
+    columns_range = np.arange(sizeX + 1, dtype=np.float64)
+    rows_range = np.arange(row_offset, row_offset + rows + 1, dtype=np.float64)
+    grid_x = xOrigin + rasterResXY[0] * columns_range + x_correction * columns_range
+    grid_y = yOrigin + rasterResXY[1] * rows_range + y_correction * rows_range
+
+    # vertex order in each quad: (h, v), (h, v+1), (h+1, v+1), (h+1, v)
+    vertices = np.zeros((rows, sizeX, 4, 3), dtype=np.float64)
+    vertices[:, :, 0, 0] = vertices[:, :, 1, 0] = grid_x[:-1]
+    vertices[:, :, 2, 0] = vertices[:, :, 3, 0] = grid_x[1:]
+    vertices[:, :, 0, 1] = vertices[:, :, 3, 1] = grid_y[:-1, np.newaxis]
+    vertices[:, :, 1, 1] = vertices[:, :, 2, 1] = grid_y[1:, np.newaxis]
 
-    return list_flattened
+    return vertices.reshape(-1)[: 12 * count]
 
 
-def apply_offset_rotation_to_vertices_send(vertices: List[float], dataStorage):
-    for index in range(int(len(vertices) / 3)):
-        x, y = apply_pt_offsets_rotation_on_send(
-            vertices[index], vertices[index + 1], dataStorage
+def get_raster_mesh_faces(count: int) -> np.ndarray:
+    """Returns a flat array of quad faces for the given number of pixels."""
+    faces = np.empty((count, 5), dtype=np.int64)
+    faces[:, 0] = 4
+    faces[:, 1:] = np.arange(4 * count, dtype=np.int64).reshape(count, 4)
+    return faces.reshape(-1)
+
+
+def get_raster_color_repeat_ratio(pixel_colors: np.ndarray) -> float:
+    """Share of the pixels with the same color as the previous pixel, a cheap estimate of the vertices to merge."""
+    if len(pixel_colors) < 2:
+        return 0.0
+    return float(np.count_nonzero(pixel_colors[1:] == pixel_colors[:-1])) / (
+        len(pixel_colors) - 1
+    )
+
+
+def get_raster_shared_grid_mesh(
+    vertices: np.ndarray,
+    colors: np.ndarray,
+    columns: int,
+    cell_indices: np.ndarray = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merges raster quad corners into shared grid vertices, (columns+1) x (rows+1) for a uniform color.
+
+    Corners of the same grid point stay separate vertices only if their colors or heights differ.
+    cell_indices: positions of the quads in the raster grid, if not all pixels are meshed.
+    """
+    count = int(len(colors) / 4)
+    if cell_indices is None:
+        cell_indices = np.arange(count, dtype=np.int64)
+    cell_rows, cell_cols = np.divmod(np.asarray(cell_indices, dtype=np.int64), columns)
+
+    # grid point index of each quad corner, in the order of get_raster_mesh_coords
+    grid_index = (cell_rows[:, np.newaxis] + np.array([0, 1, 1, 0])) * (
+        columns + 1
+    ) + (cell_cols[:, np.newaxis] + np.array([0, 0, 1, 1]))
+    grid_index = grid_index.reshape(-1)
+    corners = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+    z_bits = np.ascontiguousarray(corners[:, 2]).view(np.int64)
+
+    # sort by grid point first, so the shared vertices follow the grid order
+    order = np.lexsort((z_bits, colors, grid_index))
+    new_vertex = np.ones(len(order), dtype=bool)
+    new_vertex[1:] = (
+        (np.diff(grid_index[order]) != 0)
+        | (np.diff(colors[order].astype(np.int64)) != 0)
+        | (np.diff(z_bits[order]) != 0)
+    )
+    vertex_index = np.empty(len(order), dtype=np.int64)
+    vertex_index[order] = np.cumsum(new_vertex) - 1
+
+    faces = np.empty((count, 5), dtype=np.int64)
+    faces[:, 0] = 4
+    faces[:, 1:] = vertex_index.reshape(count, 4)
+
+    first_corners = order[new_vertex]
+    return corners[first_corners].reshape(-1), faces.reshape(-1), colors[first_corners]
+
+
+def get_raster_simplified_mesh(
+    grid_x: np.ndarray,
+    grid_y: np.ndarray,
+    grid_z: np.ndarray,
+    cell_colors: np.ndarray,
+    tolerance: float,
+    max_level: int = 8,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Builds a terrain mesh from the raster grid, merging cells into quadtree blocks where heights deviate less than the tolerance.
+
+    grid_z: heights of the (rows+1, columns+1) grid points; cell_colors: (rows, columns) colors, 0 for skipped cells.
+    Blocks are emitted as polygons including the corners of smaller neighbours on their edges, so the mesh has no cracks.
+    """
+    rows, cols = cell_colors.shape
+    visible = cell_colors != 0
+
+    # mergeable blocks per level: all cells visible, bilinear surface within tolerance
+    mergeable = [visible]
+    for level in range(1, max_level + 1):
+        size = 2**level
+        block_rows, block_cols = rows // size, cols // size
+        if block_rows == 0 or block_cols == 0:
+            break
+        children = mergeable[-1][: block_rows * 2, : block_cols * 2]
+        candidates = (
+            children[0::2, 0::2]
+            & children[1::2, 0::2]
+            & children[0::2, 1::2]
+            & children[1::2, 1::2]
         )
-        vertices[index] = x
-        vertices[index + 1] = y
+        if not candidates.any():
+            break
+        windows = np.lib.stride_tricks.sliding_window_view(
+            grid_z[: block_rows * size + 1, : block_cols * size + 1],
+            (size + 1, size + 1),
+        )[::size, ::size]
+        weights = np.linspace(0, 1, size + 1)
+        wy, wx = weights[:, np.newaxis], weights[np.newaxis, :]
+        corners = [
+            windows[:, :, i, j, np.newaxis, np.newaxis]
+            for i, j in [(0, 0), (0, -1), (-1, 0), (-1, -1)]
+        ]
+        surface = (
+            corners[0] * (1 - wy) * (1 - wx)
+            + corners[1] * (1 - wy) * wx
+            + corners[2] * wy * (1 - wx)
+            + corners[3] * wy * wx
+        )
+        error = np.abs(windows - surface).max(axis=(2, 3))
+        mergeable.append(candidates & (error <= tolerance))
+
+    # leaves: mergeable blocks not covered by a larger mergeable block
+    leaves = []
+    covered = None
+    for level in range(len(mergeable) - 1, -1, -1):
+        size = 2**level
+        block_mergeable = mergeable[level]
+        if covered is not None:
+            covered = np.repeat(np.repeat(covered, 2, axis=0), 2, axis=1)
+            padded = np.zeros(block_mergeable.shape, dtype=bool)
+            padded[: covered.shape[0], : covered.shape[1]] = covered[
+                : block_mergeable.shape[0], : block_mergeable.shape[1]
+            ]
+            covered = padded
+        else:
+            covered = np.zeros(block_mergeable.shape, dtype=bool)
+        leaf = block_mergeable & ~covered
+        leaf_rows, leaf_cols = np.nonzero(leaf)
+        leaves.append((leaf_rows * size, leaf_cols * size, size))
+        covered = covered | leaf
+
+    # grid points used by the leaves corners
+    used = np.zeros((rows + 1, cols + 1), dtype=bool)
+    for r0, c0, size in leaves:
+        for dr, dc in [(0, 0), (size, 0), (size, size), (0, size)]:
+            used[r0 + dr, c0 + dc] = True
+    vertex_index = np.cumsum(used).reshape(used.shape) - 1
+
+    # vertex color: from a visible neighbouring cell (bottom-right preferred)
+    padded_colors = np.zeros((rows + 2, cols + 2), dtype=cell_colors.dtype)
+    padded_colors[1:-1, 1:-1] = cell_colors
+    grid_colors = np.zeros((rows + 1, cols + 1), dtype=cell_colors.dtype)
+    for dr, dc in [(1, 1), (1, 0), (0, 1), (0, 0)]:
+        neighbour = padded_colors[dr : dr + rows + 1, dc : dc + cols + 1]
+        grid_colors = np.where(grid_colors == 0, neighbour, grid_colors)
+
+    faces = []
+    for r0, c0, size in leaves:
+        if len(r0) == 0:
+            continue
+        if size == 1:  # no neighbour corners on the edges
+            quads = np.stack(
+                [
+                    vertex_index[r0, c0],
+                    vertex_index[r0 + 1, c0],
+                    vertex_index[r0 + 1, c0 + 1],
+                    vertex_index[r0, c0 + 1],
+                ],
+                axis=1,
+            )
+            block = np.empty((len(r0), 5), dtype=np.int64)
+            block[:, 0] = 4
+            block[:, 1:] = quads
+            faces.append(block.reshape(-1))
+            continue
+        for r, c in zip(r0.tolist(), c0.tolist()):
+            # walk along the edges, same direction as the raster quads
+            left = vertex_index[r : r + size, c][used[r : r + size, c]]
+            bottom = vertex_index[r + size, c : c + size][used[r + size, c : c + size]]
+            right = vertex_index[r + size : r : -1, c + size][
+                used[r + size : r : -1, c + size]
+            ]
+            top = vertex_index[r, c + size : c : -1][used[r, c + size : c : -1]]
+            polygon = np.concatenate([left, bottom, right, top])
+            faces.append(np.concatenate([[len(polygon)], polygon]))
+
+    grid_points = np.zeros((rows + 1, cols + 1, 3), dtype=np.float64)
+    grid_points[:, :, 0] = grid_x[np.newaxis, :]
+    grid_points[:, :, 1] = grid_y[:, np.newaxis]
+    grid_points[:, :, 2] = np.nan_to_num(grid_z)
+    vertices = grid_points[used].reshape(-1)
+    colors = grid_colors[used]
+    if len(faces) == 0:
+        return vertices, np.array([], dtype=np.int64), colors
+    return vertices, np.concatenate(faces).astype(np.int64), colors
+
+
+def apply_offset_rotation_to_vertices_send(
+    vertices: np.ndarray, dataStorage
+) -> np.ndarray:
+    """Applies CRS offsets and rotation to the flat XYZ vertex array."""
+    coords = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    return apply_offsets_rotation_on_send_array(coords, dataStorage).reshape(-1)
+
+
+def get_raster_nodata_mask(band_values: np.ndarray, noDataVal) -> np.ndarray:
+    """Returns a boolean mask of the pixels equal to NoData value (or NaN)."""
+    mask = np.isnan(band_values)
+    if noDataVal is not None:
+        try:
+            mask |= band_values == float(noDataVal)
+        except (TypeError, ValueError):
+            pass
+    return mask
+
+
+def normalize_raster_band(band_values: np.ndarray, valMin, valMax) -> np.ndarray:
+    """Scales band values to 0-255 color channel values."""
+    vals_range = valMax - valMin
+    if not vals_range:
+        vals_range = 1
+    channel = 255 * (band_values - valMin) / vals_range
+    return np.clip(np.nan_to_num(channel), 0, 255).astype(np.uint32)
+
+
+def pack_raster_colors(
+    red: np.ndarray, green: np.ndarray, blue: np.ndarray, mask: np.ndarray
+) -> np.ndarray:
+    """Packs color channels into ARGB integers, masked pixels are transparent."""
+    colors = np.uint32(255 << 24) | (red << 16) | (green << 8) | blue
+    colors[mask] = 0
+    return colors
+
+
+def get_raster_class_colors(
+    band_values: np.ndarray, class_values: List[float], class_rgbs: list, mask
+) -> np.ndarray:
+    """Assigns each pixel the color of the class with the closest lower break value."""
+    colors = np.zeros(len(band_values), dtype=np.uint32)
+    if len(class_values) == 0:
+        return colors
+
+    breaks = np.array(class_values, dtype=np.float64)
+    class_colors = np.array(
+        [(255 << 24) + (rgb[0] << 16) + (rgb[1] << 8) + rgb[2] for rgb in class_rgbs],
+        dtype=np.uint32,
+    )
+    order = np.argsort(breaks, kind="stable")
+    breaks = breaks[order]
+    class_colors = class_colors[order]
+
+    class_index = np.searchsorted(breaks, band_values, side="right") - 1
+    in_range = (class_index >= 0) & ~mask
+    colors[in_range] = class_colors[class_index[in_range]]
+    return colors
 
 
 def get_raster_colors(
@@ -303,158 +561,59 @@ def get_raster_colors(
     rasterBandMaxVal,
     rendererType,
     plugin,
-):
-    list_colors = []
-    if rendererType == "multibandcolor":
-
-        # mock values for R,G,B channels
-        vals_red = [0 for _ in rasterBandVals[0]]
-        vals_green = [0 for _ in rasterBandVals[0]]
-        vals_blue = [0 for _ in rasterBandVals[0]]
-
-        vals_range_red = 1
-        vals_range_green = 1
-        vals_range_blue = 1
-
-        val_min_red = 0
-        val_min_green = 0
-        val_min_blue = 0
-
-        val_na_red = None
-        val_na_green = None
-        val_na_blue = None
+) -> np.ndarray:
+    """Returns ARGB colors of the raster mesh vertices (4 per pixel) following the layer renderer."""
+    band_arrays = [np.asarray(vals, dtype=np.float64) for vals in rasterBandVals]
+    pixel_count = len(band_arrays[0])
 
+    if rendererType == "multibandcolor":
         # get band index for each color channel
         bandRed = int(layer.renderer().redBand())
         bandGreen = int(layer.renderer().greenBand())
         bandBlue = int(layer.renderer().blueBand())
 
-        # assign correct values to R,G,B channels, where available
-        for band_index in range(len(rasterBandVals)):
-            # if statements are not exclusive, as QGIS allows to assugn 1 band to several color channels
-            if band_index + 1 == bandRed:
-                vals_red = rasterBandVals[band_index]
-                vals_range_red = (
-                    rasterBandMaxVal[band_index] - rasterBandMinVal[band_index]
-                )
-                val_min_red = rasterBandMinVal[band_index]
-                val_na_red = rasterBandNoDataVal[band_index]
-            if band_index + 1 == bandGreen:
-                vals_green = rasterBandVals[band_index]
-                vals_range_green = (
-                    rasterBandMaxVal[band_index] - rasterBandMinVal[band_index]
-                )
-                val_min_green = rasterBandMinVal[band_index]
-                val_na_green = rasterBandNoDataVal[band_index]
-            if band_index + 1 == bandBlue:
-                vals_blue = rasterBandVals[band_index]
-                vals_range_blue = (
-                    rasterBandMaxVal[band_index] - rasterBandMinVal[band_index]
+        # mock values for R,G,B channels, replaced where available
+        # (QGIS allows to assign 1 band to several color channels)
+        channels = []
+        mask = np.zeros(pixel_count, dtype=bool)
+        for band_number in [bandRed, bandGreen, bandBlue]:
+            band_index = band_number - 1
+            if 0 <= band_index < len(band_arrays):
+                channels.append(
+                    normalize_raster_band(
+                        band_arrays[band_index],
+                        rasterBandMinVal[band_index],
+                        rasterBandMaxVal[band_index],
+                    )
                 )
-                val_min_blue = rasterBandMinVal[band_index]
-                val_na_blue = rasterBandNoDataVal[band_index]
-
-        list_colors = [
-            (
-                (255 << 24)
-                | (int(255 * (vals_red[ind] - val_min_red) / vals_range_red) << 16)
-                | (int(255 * (vals_green[ind] - val_min_green) / vals_range_green) << 8)
-                | int(255 * (vals_blue[ind] - val_min_blue) / vals_range_blue)
-                if (
-                    vals_red[ind] != val_na_red
-                    and vals_green[ind] != val_na_green
-                    and vals_blue[ind] != val_na_blue
+                mask |= get_raster_nodata_mask(
+                    band_arrays[band_index], rasterBandNoDataVal[band_index]
                 )
-                else (0 << 24) + (0 << 16) + (0 << 8) + 0
-            )
-            for ind, _ in enumerate(rasterBandVals[0])
-            for _ in range(4)
-        ]
+            else:
+                channels.append(np.zeros(pixel_count, dtype=np.uint32))
 
-    elif rendererType == "paletted":
+        pixel_colors = pack_raster_colors(channels[0], channels[1], channels[2], mask)
+
+    elif rendererType == "paletted" or rendererType == "singlebandpseudocolor":
         try:
             bandIndex = layer.renderer().band() - 1  # int
-            renderer_classes = layer.renderer().classes()
-            class_rgbs = [
-                renderer_classes[class_ind].color.getRgb()
-                for class_ind in range(len(renderer_classes))
-            ]
 
-            for val in rasterBandVals[bandIndex]:
-                rgb = None
-                color = (0 << 24) + (0 << 16) + (0 << 8) + 0
-
-                for class_ind in range(len(renderer_classes)):
-                    if rasterBandVals[bandIndex] == rasterBandNoDataVal[bandIndex]:
-                        rgb = None
-                    elif class_ind < len(renderer_classes) - 1:
-                        if val >= float(
-                            renderer_classes[class_ind].value
-                        ) and val < float(renderer_classes[class_ind + 1].value):
-                            rgb = class_rgbs[class_ind]
-                    elif class_ind == len(renderer_classes) - 1 and val >= float(
-                        renderer_classes[class_ind].value
-                    ):
-                        rgb = class_rgbs[class_ind]
-
-                if rgb is not None:
-                    color = (255 << 24) + (rgb[0] << 16) + (rgb[1] << 8) + rgb[2]
-
-                # add color value after looping through classes/categories
-                list_colors.extend([color, color, color, color])
+            if rendererType == "paletted":
+                renderer_classes = layer.renderer().classes()
+                class_values = [float(item.value) for item in renderer_classes]
+                class_rgbs = [item.color.getRgb() for item in renderer_classes]
+            else:
+                renderer_classes = layer.renderer().legendSymbologyItems()
+                class_values = [float(item[0]) for item in renderer_classes]
+                class_rgbs = [item[1].getRgb() for item in renderer_classes]
 
-        except Exception as e:
-            # log warning, but don't prevent conversion
-            logToUser(
-                f"Raster renderer of type '{rendererType}' couldn't read the renderer class values, default renderer will be applied: {e}",
-                level=1,
-                func=inspect.stack()[0][3],
-                plugin=plugin.dockwidget,
+            mask = get_raster_nodata_mask(
+                band_arrays[bandIndex], rasterBandNoDataVal[bandIndex]
             )
-
-            return get_raster_colors(
-                layer,
-                rasterBandVals,
-                rasterBandNoDataVal,
-                rasterBandMinVal,
-                rasterBandMaxVal,
-                None,
-                plugin,
+            pixel_colors = get_raster_class_colors(
+                band_arrays[bandIndex], class_values, class_rgbs, mask
             )
 
-    elif rendererType == "singlebandpseudocolor":
-        try:
-            bandIndex = layer.renderer().band() - 1  # int
-
-            renderer_classes = layer.renderer().legendSymbologyItems()
-            class_rgbs = [
-                renderer_classes[class_ind][1].getRgb()
-                for class_ind in range(len(renderer_classes))
-            ]
-
-            for val in rasterBandVals[bandIndex]:
-                rgb = None
-                color = (0 << 24) + (0 << 16) + (0 << 8) + 0
-
-                for class_ind in range(len(renderer_classes)):
-                    if rasterBandVals[bandIndex] == rasterBandNoDataVal[bandIndex]:
-                        rgb = None
-                    elif class_ind < len(renderer_classes) - 1:
-                        if val >= float(renderer_classes[class_ind][0]) and val < float(
-                            renderer_classes[class_ind + 1][0]
-                        ):
-                            rgb = class_rgbs[class_ind]
-                    elif class_ind == len(renderer_classes) - 1 and val >= float(
-                        renderer_classes[class_ind][0]
-                    ):
-                        rgb = class_rgbs[class_ind]
-
-                if rgb is not None:
-                    color = (255 << 24) + (rgb[0] << 16) + (rgb[1] << 8) + rgb[2]
-
-                # add color value after looping through classes/categories
-                list_colors.extend([color, color, color, color])
-
         except Exception as e:
             # log warning, but don't prevent conversion
             logToUser(
@@ -481,112 +640,52 @@ def get_raster_colors(
                 level=1,
                 func=inspect.stack()[0][3],
             )
-        pixMin = rasterBandMinVal[0]
-        pixMax = rasterBandMaxVal[0]
-        vals_range = pixMax - pixMin
-
-        list_colors: List[int] = [
-            (
-                (255 << 24)
-                | (int(255 * (rasterBandVals[0][ind] - pixMin) / vals_range) << 16)
-                | (int(255 * (rasterBandVals[0][ind] - pixMin) / vals_range) << 8)
-                | int(255 * (rasterBandVals[0][ind] - pixMin) / vals_range)
-                if rasterBandVals[0][ind] != rasterBandNoDataVal[0]
-                else (0 << 24) + (0 << 16) + (0 << 8) + 0
-            )
-            for ind, _ in enumerate(rasterBandVals[0])
-            for _ in range(4)
-        ]
-
-    return list_colors
-
+        channel = normalize_raster_band(
+            band_arrays[0], rasterBandMinVal[0], rasterBandMaxVal[0]
+        )
+        mask = get_raster_nodata_mask(band_arrays[0], rasterBandNoDataVal[0])
+        pixel_colors = pack_raster_colors(channel, channel, channel, mask)
 
-def get_vertices_height(
-    vertices_filtered: List[float],
-    xy_z_values: dict,
-    vertices_list_index: int,
-    height_array,
-    indices: tuple,
-):
-    index1, index1_0, index2, index2_0 = indices
-    # top vertices ######################################
-    try:
-        z1 = xy_z_values[
-            (
-                vertices_filtered[vertices_list_index],
-                vertices_filtered[vertices_list_index + 1],
-            )
-        ]
-    except KeyError:
-        if index1 > 0 and index2 > 0:
-            z1 = height_array[index1_0][index2_0]
-        elif index1 > 0:
-            z1 = height_array[index1_0][index2]
-        elif index2 > 0:
-            z1 = height_array[index1][index2_0]
-        else:
-            z1 = height_array[index1][index2]
+    # same color for all 4 vertices of the pixel
+    return np.repeat(pixel_colors, 4)
 
-        if z1 is not None:
-            xy_z_values[
-                (
-                    vertices_filtered[vertices_list_index],
-                    vertices_filtered[vertices_list_index + 1],
-                )
-            ] = z1
 
-    #################### z4
-    try:
-        z4 = xy_z_values[
-            (
-                vertices_filtered[vertices_list_index + 9],
-                vertices_filtered[vertices_list_index + 10],
-            )
-        ]
-    except:
-        if index1 > 0:
-            z4 = height_array[index1_0][index2]
-        else:
-            z4 = height_array[index1][index2]
+def get_raster_band_stats(rb, band_values: np.ndarray = None) -> Tuple:
+    """Returns min and max of the valid band values and min of the extremely small values (or None), in one pass over the band."""
+    const = float(-1 * math.pow(10, 30))
+    defaultNoData = rb.GetNoDataValue()
 
-        if z4 is not None:
-            xy_z_values[
-                (
-                    vertices_filtered[vertices_list_index + 9],
-                    vertices_filtered[vertices_list_index + 10],
-                )
-            ] = z4
-
-    # bottom vertices ######################################
-    z3 = height_array[index1][index2]
-    if z3 is not None:
-        xy_z_values[
-            (
-                vertices_filtered[vertices_list_index + 6],
-                vertices_filtered[vertices_list_index + 7],
+    if band_values is not None:
+        strips = [band_values]
+    else:
+        tile_rows = get_raster_tile_rows(rb.XSize)
+        strips = (
+            rb.ReadAsArray(
+                0, row_offset, rb.XSize, min(tile_rows, rb.YSize - row_offset)
             )
-        ] = z3
+            for row_offset in range(0, rb.YSize, tile_rows)
+        )
 
-    try:
-        z2 = xy_z_values[
-            (
-                vertices_filtered[vertices_list_index + 3],
-                vertices_filtered[vertices_list_index + 4],
+    valMin = valMax = extremeMin = None
+    for values in strips:
+        values = np.ma.masked_invalid(values)
+        if defaultNoData is not None:
+            values = np.ma.masked_equal(values, defaultNoData)
+        extreme = values <= const
+        valid = np.ma.masked_where(extreme, values)
+        if valid.count() > 0:
+            strip_min, strip_max = float(valid.min()), float(valid.max())
+            valMin = strip_min if valMin is None else min(valMin, strip_min)
+            valMax = strip_max if valMax is None else max(valMax, strip_max)
+        if np.ma.any(extreme):
+            strip_min = float(values[extreme].min())
+            extremeMin = (
+                strip_min if extremeMin is None else min(extremeMin, strip_min)
             )
-        ]
-    except:
-        if index2 > 0:
-            z2 = height_array[index1][index2_0]
-        else:
-            z2 = height_array[index1][index2]
-        if z2 is not None:
-            xy_z_values[
-                (
-                    vertices_filtered[vertices_list_index + 3],
-                    vertices_filtered[vertices_list_index + 4],
-                )
-            ] = z2
-    return z1, z2, z3, z4
+    if valMin is None:
+        # no valid values (all NoData or NaN): empty range, all pixels are masked
+        valMin = valMax = 0.0
+    return valMin, valMax, extremeMin
 
 
 def get_raster_band_data(
@@ -595,107 +694,104 @@ def get_raster_band_data(
     index,
     rasterBandNames,
     rasterBandNoDataVal,
-    rasterBandVals,
     rasterBandMinVal,
     rasterBandMaxVal,
-) -> List[float]:
+    band_stats: Tuple = None,
+):
+    """Collects band name, NoData value and value range (from the band stats, if already computed)."""
     rasterBandNames.append(selectedLayer.bandName(index + 1))
     rb = ds.GetRasterBand(index + 1)
-    valMin = (
-        selectedLayer.dataProvider()
-        .bandStatistics(index + 1, QgsRasterBandStats.All)
-        .minimumValue
-    )
-    valMax = (
-        selectedLayer.dataProvider()
-        .bandStatistics(index + 1, QgsRasterBandStats.All)
-        .maximumValue
-    )
-    bandVals = rb.ReadAsArray().tolist()
-
-    bandValsFlat = []
-    [bandValsFlat.extend(item) for item in bandVals]
-    # look at mesh chunking
+    if band_stats is None:
+        band_stats = get_raster_band_stats(rb)
+    valMin, valMax, extremeMin = band_stats
 
     const = float(-1 * math.pow(10, 30))
     defaultNoData = rb.GetNoDataValue()
-    # print(type(rb.GetNoDataValue()))
 
     # check whether NA value is too small or raster has too small values
-    # assign min value of an actual list; re-assign NA val; replace list items to new NA val
+    # re-assign NA val; extreme values are replaced with it when reading the band
     try:
-        # create "safe" fake NA value; replace extreme values with it
-        fakeNA = max(bandValsFlat) + 1
-        bandValsFlatFake = [
-            fakeNA if val <= const else val for val in bandValsFlat
-        ]  # replace all values corresponding to NoData value
-
         # if default NA value is too small
         if (
             isinstance(defaultNoData, float) or isinstance(defaultNoData, int)
         ) and defaultNoData < const:
-            # find and rewrite min of actual band values; create new NA value
-            valMin = min(bandValsFlatFake)
             noDataValNew = valMin - 1000  # use new adequate value
             rasterBandNoDataVal.append(noDataValNew)
-            # replace fake NA with new NA
-            bandValsFlat = [
-                noDataValNew if val == fakeNA else val for val in bandValsFlatFake
-            ]  # replace all values corresponding to NoData value
 
-        # if default val unaccessible and minimum val is too small
+        # if default val unaccessible and there are extremely small values
         elif (
             isinstance(defaultNoData, str) or defaultNoData is None
-        ) and valMin < const:  # if there are extremely small values but default NA unaccessible
-            noDataValNew = valMin
+        ) and extremeMin is not None:
+            noDataValNew = extremeMin
             rasterBandNoDataVal.append(noDataValNew)
-            # replace fake NA with new NA
-            bandValsFlat = [
-                noDataValNew if val == fakeNA else val for val in bandValsFlatFake
-            ]  # replace all values corresponding to NoData value
-            # last, change minValto actual one
-            valMin = min(bandValsFlatFake)
 
         else:
             rasterBandNoDataVal.append(rb.GetNoDataValue())
     except:
         rasterBandNoDataVal.append(rb.GetNoDataValue())
 
-    rasterBandVals.append(bandValsFlat)
     rasterBandMinVal.append(valMin)
     rasterBandMaxVal.append(valMax)
-    return bandValsFlat
-
 
-def get_height_array_from_elevation_layer(elevationLayer):
-    elevation_arrays, _, _, all_na = getRasterArrays(elevationLayer)
-    if elevation_arrays is None:
-        return None
-    array_band = elevation_arrays[0]
 
+def read_raster_band_tile(
+    rb, row_offset: int, rows: int, noDataVal, band_values: np.ndarray = None
+) -> np.ndarray:
+    """Reads a strip of full raster rows as a flat array, extreme values replaced with the re-assigned NoData value."""
+    if band_values is None:
+        values = rb.ReadAsArray(0, row_offset, rb.XSize, rows).reshape(-1)
+    else:  # already read
+        values = band_values[row_offset : row_offset + rows].reshape(-1)
+    if noDataVal != rb.GetNoDataValue() and np.issubdtype(values.dtype, np.floating):
+        const = float(-1 * math.pow(10, 30))
+        values = np.where(values <= const, noDataVal, values).astype(values.dtype)
+    return values
+
+
+def serialize_raster_band_values(
+    values: np.ndarray, columns: int, compact: bool = False
+) -> list:
+    """Returns raster band values in the form they are sent: encoded chunks (if compact) or a list of numbers."""
+    if compact is True:
+        return encodeRasterBandValues(values, columns)
+    return values.tolist()
+
+
+def get_height_array_from_dataset(ds) -> np.ndarray:
+    """Returns heights from the first band of the dataset, NaN for NoData and extreme values."""
+    band = ds.GetRasterBand(1)
+    array_band = band.ReadAsArray().astype(float)
     const = float(-1 * math.pow(10, 30))
-    height_array = np.where(
-        (array_band < const) | (array_band > -1 * const) | (array_band == all_na[0]),
+    return np.where(
+        (array_band < const)
+        | (array_band > -1 * const)
+        | (array_band == band.GetNoDataValue())
+        | (np.isinf(array_band)),
         np.nan,
         array_band,
     )
-    try:
-        height_array = height_array.astype(float)
-    except:
-        try:
-            arr = []
-            for row in height_array:
-                new_row = []
-                for item in row:
-                    try:
-                        new_row.append(float(item))
-                    except:
-                        new_row.append(np.nan)
-                arr.append(new_row)
-            height_array = np.array(arr).astype(float)
-        except:
-            height_array = height_array[[isinstance(i, float) for i in height_array]]
-    return height_array
+
+
+def read_raster_band_values(
+    ds, rasterBandNoDataVal, band_pool: RasterBandPool, compact: bool = False
+) -> Tuple[List[list], List[str]]:
+    """Reads values of all raster bands strip by strip (bands in parallel), returns them serialized, with their types."""
+    rasterBandVals = [[] for _ in range(ds.RasterCount)]
+    rasterBandTypes = [None for _ in range(ds.RasterCount)]
+    tile_rows = get_raster_tile_rows(ds.RasterXSize)
+    for row_offset in range(0, ds.RasterYSize, tile_rows):
+        rows = min(tile_rows, ds.RasterYSize - row_offset)
+        tile_band_values = band_pool.map(
+            lambda rb, index: read_raster_band_tile(
+                rb, row_offset, rows, rasterBandNoDataVal[index]
+            )
+        )
+        for index, values in enumerate(tile_band_values):
+            rasterBandVals[index].extend(
+                serialize_raster_band_values(values, ds.RasterXSize, compact)
+            )
+            rasterBandTypes[index] = str(values.dtype)
+    return rasterBandVals, rasterBandTypes
 
 
 def get_raster_reprojected_stats(
@@ -773,60 +869,161 @@ def get_elevation_indices(
     rasterResXY_reprojected,
     reprojectedOriginX,
     reprojectedOriginY,
-    h,
-    v,
+    rasterDimensions,
     elevationResX,
     elevationResY,
     elevationOriginX,
     elevationOriginY,
     elevationSizeX,
     elevationSizeY,
-):
+    row_offset: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Returns elevation array indices for all raster cells (and their preceding diagonal neighbours), and the mask of cells with valid indices."""
+    rows = np.arange(row_offset, row_offset + rasterDimensions[1])[:, np.newaxis]
+    cols = np.arange(rasterDimensions[0])[np.newaxis, :]
+
     if texture_transform is True:  # texture
         # index1: index on y-scale
-        posX, posY = getXYofArrayPoint(
-            rasterResXY_reprojected,
-            reprojectedOriginX,
-            reprojectedOriginY,
-            h,
-            v,
+        posX = reprojectedOriginX + rasterResXY_reprojected[0] * cols
+        posY = reprojectedOriginY + rasterResXY_reprojected[1] * rows
+        settings = (
+            elevationResX,
+            elevationResY,
+            elevationOriginX,
+            elevationOriginY,
+            elevationSizeX,
+            elevationSizeY,
+            None,
+            None,
         )
-
-        index1, index2, _, _ = getArrayIndicesFromXY(
-            (
-                elevationResX,
-                elevationResY,
-                elevationOriginX,
-                elevationOriginY,
-                elevationSizeX,
-                elevationSizeY,
-                None,
-                None,
-            ),
-            posX,
-            posY,
+        index1, index2 = getArrayIndicesFromXYArrays(settings, posX, posY)
+        index1_0, index2_0 = getArrayIndicesFromXYArrays(
+            settings, posX - rasterResXY[0], posY - rasterResXY[1]
         )
+        valid = (index1 >= 0) & (index1_0 >= 0)
+    else:  # elevation
+        index1, index2 = np.broadcast_arrays(rows, cols)
+        index1_0 = index1 - 1
+        index2_0 = index2 - 1
+        valid = np.ones(index1.shape, dtype=bool)
+    return index1, index1_0, index2, index2_0, valid
+
+
+def get_raster_grid_heights(
+    height_array: Union[np.ndarray, ElevationSampler], indices: tuple
+) -> np.ndarray:
+    """Gathers heights of the raster grid points (1 larger than the raster in both dimensions), NaN where unavailable."""
+    index1, index1_0, index2, index2_0, valid = indices
+    valid = (
+        valid
+        & (index1 < height_array.shape[0])
+        & (index1_0 < height_array.shape[0])
+        & (index2 < height_array.shape[1])
+        & (index2_0 < height_array.shape[1])
+    )
+    index1, index2 = np.where(valid, index1, 0), np.where(valid, index2, 0)
+    index1_0 = np.where(valid & (index1 > 0), index1_0, index1)
+    index2_0 = np.where(valid & (index2 > 0), index2_0, index2)
+
+    # each cell defines the height of its bottom-right corner,
+    # the first row and column also take the top and left corners
+    z_corner = np.where(valid, height_array[index1, index2], np.nan)
+    z_top = np.where(valid[0], height_array[index1_0[0], index2[0]], np.nan)
+    z_left = np.where(valid[:, 0], height_array[index1[:, 0], index2_0[:, 0]], np.nan)
+
+    grid_heights = np.full(
+        (index1.shape[0] + 1, index1.shape[1] + 1), np.nan, dtype=np.float64
+    )
+    grid_heights[1:, 1:] = z_corner
+    grid_heights[0, 1:] = z_top
+    grid_heights[1:, 0] = z_left
+    if valid[0, 0]:
+        grid_heights[0, 0] = height_array[index1_0[0, 0], index2_0[0, 0]]
+    return grid_heights
+
+
+def smooth_raster_grid_heights(grid_heights: np.ndarray, sigma: float) -> np.ndarray:
+    """Fills NaN heights by interpolation along the flattened grid and applies Gaussian smoothing."""
+    array_z_filled = np.array(grid_heights)
+    mask = np.isnan(array_z_filled)
+    array_z_filled[mask] = np.interp(
+        np.flatnonzero(mask), np.flatnonzero(~mask), array_z_filled[~mask]
+    )
+    return sp.ndimage.filters.gaussian_filter(array_z_filled, sigma, mode="nearest")
 
-        index1_0, index2_0, _, _ = getArrayIndicesFromXY(
-            (
-                elevationResX,
-                elevationResY,
-                elevationOriginX,
-                elevationOriginY,
-                elevationSizeX,
-                elevationSizeY,
-                None,
-                None,
-            ),
-            posX - rasterResXY[0],
-            posY - rasterResXY[1],
+
+def set_raster_vertices_heights(
+    vertices: np.ndarray, grid_heights: np.ndarray, smoothed_heights: np.ndarray
+):
+    """Writes smoothed heights into the quad vertices of cells with a known top-left height."""
+    rows, cols = grid_heights.shape[0] - 1, grid_heights.shape[1] - 1
+    z_values = vertices.reshape(rows, cols, 4, 3)[:, :, :, 2]
+    known = ~np.isnan(grid_heights[:-1, :-1])
+
+    z_values[:, :, 0][known] = smoothed_heights[:-1, :-1][known]
+    z_values[:, :, 1][known] = smoothed_heights[1:, :-1][known]
+    z_values[:, :, 2][known] = smoothed_heights[1:, 1:][known]
+    z_values[:, :, 3][known] = smoothed_heights[:-1, 1:][known]
+
+
+def set_raster_tile_heights(
+    vertices: np.ndarray,
+    colors: np.ndarray,
+    height_array: Union[np.ndarray, ElevationSampler],
+    texture_transform: bool,
+    rasterResXY,
+    rasterResXY_reprojected,
+    reprojectedOriginX,
+    reprojectedOriginY,
+    rasterDimensions,
+    elevation_settings: tuple,
+    row_offset: int,
+    rows: int,
+) -> Union[np.ndarray, None]:
+    """Samples and smoothens heights of the raster strip vertices; colors pixels outside of the elevation layer transparent.
+
+    Returns smoothed heights of the strip grid points, if available.
+    """
+    # include neighbouring rows, so that the smoothing matches across strips
+    halo_start = max(0, row_offset - RASTER_TILE_HALO_ROWS)
+    halo_end = min(rasterDimensions[1], row_offset + rows + RASTER_TILE_HALO_ROWS)
+    start = row_offset - halo_start
+
+    indices = get_elevation_indices(
+        texture_transform,
+        rasterResXY,
+        rasterResXY_reprojected,
+        reprojectedOriginX,
+        reprojectedOriginY,
+        [rasterDimensions[0], halo_end - halo_start],
+        *elevation_settings,
+        row_offset=halo_start,
+    )
+    # color vertices outside of the elevation layer transparent
+    valid = indices[4][start : start + rows]
+    colors.reshape(rows, rasterDimensions[0], 4)[~valid] = 0
+
+    grid_heights = get_raster_grid_heights(height_array, indices)
+
+    ## smoothen z-values
+    if (
+        grid_heights.shape[1] > 2
+        and grid_heights.shape[0] > 2
+        and not np.isnan(grid_heights).all()
+    ):
+        sigma = 0.8  # for elevation
+        if texture_transform is True:
+            sigma = 1  # for texture
+
+        gaussian_array = smooth_raster_grid_heights(grid_heights, sigma)
+        # update vertices with z-value
+        set_raster_vertices_heights(
+            vertices,
+            grid_heights[start : start + rows + 1],
+            gaussian_array[start : start + rows + 1],
         )
-    else:  # elevation
-        index1 = v
-        index1_0 = v - 1
-        index2 = h
-        index2_0 = h - 1
-    return index1, index1_0, index2, index2_0
+        return gaussian_array[start : start + rows + 1]
+    return None
 
 
 def rasterFeatureToSpeckle(
@@ -840,9 +1037,9 @@ def rasterFeatureToSpeckle(
         return
 
     b = GisRasterElement(units=dataStorage.currentUnits)
+    lod_path = None
+    band_pool = None
     try:
-        time0 = datetime.now()
-
         terrain_transform = isAppliedLayerTransformByKeywords(
             selectedLayer, ["elevation", "mesh"], ["texture"], dataStorage
         )
@@ -853,9 +1050,26 @@ def rasterFeatureToSpeckle(
             b = GisTopography(units=dataStorage.currentUnits)
 
         rasterBandCount = selectedLayer.bandCount()
-        rasterDimensions = [selectedLayer.width(), selectedLayer.height()]
+        rendererType = selectedLayer.renderer().type()
 
-        ds = gdal.Open(selectedLayer.source(), gdal.GA_ReadOnly)
+        # reduce the mesh resolution, if level of detail is set for the layer
+        ds_original = gdal.Open(selectedLayer.source(), gdal.GA_ReadOnly)
+        max_cells, full_values = getRasterLayerLod(selectedLayer, dataStorage)
+        ds, lod_path, lod_open_options = get_raster_lod_dataset(
+            ds_original,
+            selectedLayer.source(),
+            max_cells,
+            "nearest" if rendererType == "paletted" else "average",
+        )
+        # dataset to take the sent band values from
+        ds_values = ds_original if full_values is True else ds
+
+        # bands are read in parallel, each thread with its own dataset handle
+        band_pool = RasterBandPool(
+            lod_path or selectedLayer.source(), rasterBandCount, lod_open_options
+        )
+
+        rasterDimensions = [ds.RasterXSize, ds.RasterYSize]
         rasterResXY = [float(ds.GetGeoTransform()[1]), float(ds.GetGeoTransform()[5])]
 
         originX = ds.GetGeoTransform()[0]
@@ -883,31 +1097,34 @@ def rasterFeatureToSpeckle(
             reprojectedOriginPt.y(),
         )
 
-        # fill band values
+        # get band properties; values are read in strips further,
+        # unless the raster fits in one strip: then read it once and reuse
+        band_arrays = [None for _ in range(rasterBandCount)]
+        if get_raster_tile_rows(rasterDimensions[0]) >= rasterDimensions[1]:
+            band_arrays = band_pool.map(lambda rb, index: rb.ReadAsArray())
+        band_stats = band_pool.map(
+            lambda rb, index: get_raster_band_stats(rb, band_arrays[index])
+        )
         rasterBandNoDataVal = []
         rasterBandMinVal = []
         rasterBandMaxVal = []
-        rasterBandVals = []
         rasterBandNames = []
         for index in range(rasterBandCount):
-            bandValsFlat = get_raster_band_data(
+            get_raster_band_data(
                 selectedLayer,
                 ds,
                 index,
                 rasterBandNames,
                 rasterBandNoDataVal,
-                rasterBandVals,
                 rasterBandMinVal,
                 rasterBandMaxVal,
-            )
-            b["@(10000)" + selectedLayer.bandName(index + 1) + "_values"] = (
-                bandValsFlat  # [0:int(max_values/rasterBandCount)]
+                band_stats[index],
             )
 
-        b.x_resolution = rasterResXY[0]
-        b.y_resolution = rasterResXY[1]
-        b.x_size = rasterDimensions[0]
-        b.y_size = rasterDimensions[1]
+        b.x_resolution = float(ds_values.GetGeoTransform()[1])
+        b.y_resolution = float(ds_values.GetGeoTransform()[5])
+        b.x_size = ds_values.RasterXSize
+        b.y_size = ds_values.RasterYSize
         b.x_origin, b.y_origin = apply_pt_offsets_rotation_on_send(
             reprojectedOriginPt.x(), reprojectedOriginPt.y(), dataStorage
         )
@@ -916,7 +1133,6 @@ def rasterFeatureToSpeckle(
         b.noDataValue = rasterBandNoDataVal
 
         # creating a mesh
-        xy_z_values: Dict[tuple, float] = {}
         #############################################################
 
         elevationLayer = None
@@ -999,7 +1215,11 @@ def rasterFeatureToSpeckle(
                 #################
 
         if elevationLayer is not None:
-            height_array = get_height_array_from_elevation_layer(elevationLayer)
+            if terrain_transform is True and ds is not ds_original:
+                height_array = get_height_array_from_dataset(ds)
+            else:
+                # heights are read by blocks, on demand
+                height_array = getElevationSampler(elevationLayer, dataStorage)
             if height_array is None:
                 logToUser(
                     f"Elevation layer is not found. Texture transformation for layer '{selectedLayer.name()}' will not be applied",
@@ -1007,165 +1227,186 @@ def rasterFeatureToSpeckle(
                     plugin=plugin.dockwidget,
                 )
 
-        largeTransform = False
+        ############################################################
+        # construct meshes, strip by strip
+        elevation_settings = None
         if (
-            texture_transform is True
-            and height_array is not None
-            and rasterDimensions[1] * rasterDimensions[0] >= 250000
-        ):
-            # warning if >= 500x500 raster is being projected to any elevation
-            logToUser(
-                f"Texture transformation for the layer '{selectedLayer.name()}' might take a while 🕒",
-                level=0,
-                plugin=plugin.dockwidget,
+            texture_transform is True or terrain_transform is True
+        ) and height_array is not None:
+            elevation_settings = (
+                elevationResX,
+                elevationResY,
+                elevationOriginX,
+                elevationOriginY,
+                elevationSizeX,
+                elevationSizeY,
             )
-            largeTransform = True
-        ############################################################
-        array_z = []  # size is larger by 1 than the raster size, in both dimensions
-
-        faces_filtered = []
-        colors_filtered = []
-        vertices_filtered = []
-
-        # construct mesh
-        band1_values = rasterBandVals[0]
-        list_nested = [
-            (4, 4 * ind, 4 * ind + 1, 4 * ind + 2, 4 * ind + 3)
-            for ind, _ in enumerate(band1_values)
-        ]
-        faces_filtered = [item for sublist in list_nested for item in sublist]
-        vertices_filtered = get_raster_mesh_coords(
-            reprojected_raster_stats,
-            rasterResXY_reprojected,
-            band1_values,
-            dataStorage,
-        )
-        rendererType = selectedLayer.renderer().type()
-        colors_filtered = get_raster_colors(
-            selectedLayer,
-            rasterBandVals,
-            rasterBandNoDataVal,
-            rasterBandMinVal,
-            rasterBandMaxVal,
-            rendererType,
-            plugin,
+        rasterBandVals = [[] for _ in range(rasterBandCount)]
+        rasterBandTypes = [None for _ in range(rasterBandCount)]
+        meshes = []
+
+        # options saved with the raster layer transform
+        raster_options = getRasterLayerTransformOptions(selectedLayer, dataStorage)
+        shared_vertices = (
+            RASTER_MESH_SHARED_VERTICES is True and "vertices" not in raster_options
         )
-        ###############################################################################
-        if texture_transform is True or terrain_transform is True:
-            for v in range(rasterDimensions[1]):  # each row, Y
-                if largeTransform is True:
-                    show_progress(v, rasterDimensions[1], selectedLayer.name(), plugin)
-
-                row_z = []
-                row_z_bottom = []
-                for h in range(rasterDimensions[0]):  # item in a row, X
-                    vertices_list_index = 3 * 4 * (v * rasterDimensions[0] + h)
-                    colors_list_index = 4 * (v * rasterDimensions[0] + h)
-
-                    z1 = z2 = z3 = z4 = 0
-                    index1 = index1_0 = None
-
-                    #############################################################
-                    if height_array is not None:
-                        index1, index1_0, index2, index2_0 = get_elevation_indices(
-                            texture_transform,
-                            rasterResXY,
-                            rasterResXY_reprojected,
-                            reprojectedOriginX,
-                            reprojectedOriginY,
-                            h,
-                            v,
-                            elevationResX,
-                            elevationResY,
-                            elevationOriginX,
-                            elevationOriginY,
-                            elevationSizeX,
-                            elevationSizeY,
-                        )
-                        if index1 is None or index1_0 is None:
-                            z1 = z2 = z3 = z4 = np.nan
-                        else:
-                            z1, z2, z3, z4 = get_vertices_height(
-                                vertices_filtered,
-                                xy_z_values,
-                                vertices_list_index,
-                                height_array,
-                                (index1, index1_0, index2, index2_0),
-                            )
-
-                        ### height list to smoothen later:
-                        if h == 0:
-                            row_z.append(z1)
-                            row_z_bottom.append(z2)
-                        row_z.append(z4)
-                        row_z_bottom.append(z3)
-
-                    # color vertices according to QGIS renderer
-                    if height_array is not None and (
-                        index1 is None or index1_0 is None
-                    ):  # transparent color
-                        colors_filtered[colors_list_index] = colors_filtered[
-                            colors_list_index + 1
-                        ] = colors_filtered[colors_list_index + 2] = colors_filtered[
-                            colors_list_index + 3
-                        ] = (
-                            (0 << 24) + (0 << 16) + (0 << 8) + 0
+        skip_nodata = RASTER_MESH_SKIP_NODATA is True and "nodata" not in raster_options
+        compact_values = "compact" in raster_options
+
+        # terrain simplification, for elevation-to-mesh transforms
+        simplify_tolerance = None
+        if terrain_transform is True:
+            simplify_tolerance = getRasterLayerSimplifyTolerance(
+                selectedLayer, dataStorage
+            )
+
+        tile_rows = get_raster_tile_rows(rasterDimensions[0])
+        progress_step = 0
+        for row_offset in range(0, rasterDimensions[1], tile_rows):
+            rows = min(tile_rows, rasterDimensions[1] - row_offset)
+
+            tile_band_values = band_pool.map(
+                lambda rb, index: read_raster_band_tile(
+                    rb,
+                    row_offset,
+                    rows,
+                    rasterBandNoDataVal[index],
+                    band_arrays[index],
+                )
+            )
+            if ds_values is ds:
+                for index, values in enumerate(tile_band_values):
+                    rasterBandVals[index].extend(
+                        serialize_raster_band_values(
+                            values, rasterDimensions[0], compact_values
                         )
+                    )
+                    rasterBandTypes[index] = str(values.dtype)
+            if meshes is None:  # keep reading the band values only
+                continue
+
+            faces_filtered = get_raster_mesh_faces(len(tile_band_values[0]))
+            vertices_filtered = get_raster_mesh_coords(
+                reprojected_raster_stats,
+                rasterResXY_reprojected,
+                tile_band_values[0],
+                dataStorage,
+                row_offset,
+            )
+            colors_filtered = get_raster_colors(
+                selectedLayer,
+                tile_band_values,
+                rasterBandNoDataVal,
+                rasterBandMinVal,
+                rasterBandMaxVal,
+                rendererType,
+                plugin,
+            )
+            grid_z = None
+            if elevation_settings is not None:
+                grid_z = set_raster_tile_heights(
+                    vertices_filtered,
+                    colors_filtered,
+                    height_array,
+                    texture_transform,
+                    rasterResXY,
+                    rasterResXY_reprojected,
+                    reprojectedOriginX,
+                    reprojectedOriginY,
+                    rasterDimensions,
+                    elevation_settings,
+                    row_offset,
+                    rows,
+                )
 
-                if terrain_transform is True or texture_transform is True:
-                    if v == 0:
-                        array_z.append(row_z)
-                    array_z.append(row_z_bottom)
+            cells = None
+            simplified = simplify_tolerance is not None and grid_z is not None
+            if simplified is True:
+                quads = vertices_filtered.reshape(rows, rasterDimensions[0], 4, 3)
+                grid_x = np.append(quads[0, :, 0, 0], quads[0, -1, 3, 0])
+                grid_y = np.append(quads[:, 0, 0, 1], quads[-1, 0, 1, 1])
+                (
+                    vertices_filtered,
+                    faces_filtered,
+                    colors_filtered,
+                ) = get_raster_simplified_mesh(
+                    grid_x,
+                    grid_y,
+                    grid_z,
+                    colors_filtered[::4].reshape(rows, rasterDimensions[0]),
+                    simplify_tolerance,
+                )
 
-        ## smoothen z-values
-        if (
-            (terrain_transform is True or texture_transform is True)
-            and len(row_z) > 2
-            and len(array_z) > 2
-        ):
-            array_z_nans = np.array(array_z)
+            elif skip_nodata is True:
+                # same color for all 4 vertices of the pixel: check the first one
+                cells = np.flatnonzero(colors_filtered[::4] != 0)
+                vertices_filtered = vertices_filtered.reshape(-1, 12)[cells].reshape(-1)
+                colors_filtered = colors_filtered.reshape(-1, 4)[cells].reshape(-1)
+                faces_filtered = get_raster_mesh_faces(len(cells))
 
-            array_z_filled = np.array(array_z)
-            mask = np.isnan(array_z_filled)
-            array_z_filled[mask] = np.interp(
-                np.flatnonzero(mask), np.flatnonzero(~mask), array_z_filled[~mask]
-            )
+            if (
+                shared_vertices is True
+                and simplified is False
+                and get_raster_color_repeat_ratio(colors_filtered[::4])
+                >= RASTER_MESH_SHARED_MIN_REPEAT
+            ):
+                (
+                    vertices_filtered,
+                    faces_filtered,
+                    colors_filtered,
+                ) = get_raster_shared_grid_mesh(
+                    vertices_filtered, colors_filtered, rasterDimensions[0], cells
+                )
 
-            sigma = 0.8  # for elevation
-            if texture_transform is True:
-                sigma = 1  # for texture
+            if len(colors_filtered) > 0:
+                # apply offset & rotation
+                vertices_filtered = apply_offset_rotation_to_vertices_send(
+                    vertices_filtered, dataStorage
+                )
 
-            gaussian_array = sp.ndimage.filters.gaussian_filter(
-                array_z_filled, sigma, mode="nearest"
+                mesh = constructMeshFromRaster(
+                    vertices_filtered, faces_filtered, colors_filtered, dataStorage
+                )
+                if mesh is None:
+                    meshes = None
+                    continue
+                mesh.units = dataStorage.currentUnits
+                meshes.append(mesh)
+
+            current_step = int(
+                100 * (row_offset + rows) / rasterDimensions[1] / RASTER_PROGRESS_STEP
             )
+            if rows < rasterDimensions[1] and current_step > progress_step:
+                progress_step = current_step
+                show_progress(
+                    row_offset + rows,
+                    rasterDimensions[1],
+                    selectedLayer.name(),
+                    plugin,
+                )
 
-            # update vertices_filtered with z-value
-            for v in range(rasterDimensions[1]):  # each row, Y
-                for h in range(rasterDimensions[0]):  # item in a row, X
-                    vertices_list_index = 3 * 4 * (v * rasterDimensions[0] + h)
-                    if not np.isnan(array_z_nans[v][h]):
-                        vertices_filtered[vertices_list_index + 2] = gaussian_array[v][
-                            h
-                        ]
-                        vertices_filtered[vertices_list_index + 5] = gaussian_array[
-                            v + 1
-                        ][h]
-                        vertices_filtered[vertices_list_index + 8] = gaussian_array[
-                            v + 1
-                        ][h + 1]
-                        vertices_filtered[vertices_list_index + 11] = gaussian_array[v][
-                            h + 1
-                        ]
-
-        # apply offset & rotation
-        apply_offset_rotation_to_vertices_send(vertices_filtered, dataStorage)
-
-        mesh = constructMeshFromRaster(
-            vertices_filtered, faces_filtered, colors_filtered, dataStorage
-        )
-        if mesh is not None:
-            mesh.units = dataStorage.currentUnits
-            b.displayValue = [mesh]
+        band_pool.close()
+        if ds_values is not ds:
+            with RasterBandPool(selectedLayer.source(), rasterBandCount) as values_pool:
+                rasterBandVals, rasterBandTypes = read_raster_band_values(
+                    ds_values, rasterBandNoDataVal, values_pool, compact_values
+                )
+
+        for index in range(rasterBandCount):
+            if compact_values is True:
+                # each encoded chunk is detached separately
+                b["@(1)" + selectedLayer.bandName(index + 1) + "_values_encoded"] = (
+                    rasterBandVals[index]
+                )
+            else:
+                b["@(10000)" + selectedLayer.bandName(index + 1) + "_values"] = (
+                    rasterBandVals[index]
+                )
+        if compact_values is True:
+            b.band_value_types = rasterBandTypes
+
+        if meshes is not None:
+            b.displayValue = meshes
         else:
             logToUser(
                 "Something went wrong. Mesh cannot be created, only raster data will be sent. ",
@@ -1173,14 +1414,20 @@ def rasterFeatureToSpeckle(
                 plugin=plugin.dockwidget,
             )
 
-        time1 = datetime.now()
-        print(f"Time to convert Raster: {(time1-time0).total_seconds()} sec")
         return b
 
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
         raise e
 
+    finally:
+        # stop the reading threads and free the resampled raster kept in memory,
+        # also if conversion failed
+        if band_pool is not None:
+            band_pool.close()
+        if lod_path is not None:
+            gdal.Unlink(lod_path)
+
 
 def featureToNative(feature: Base, fields: "QgsFields", dataStorage):
     feat = QgsFeature()
@@ -1,12 +1,21 @@
 import inspect
 import random
-from typing import Any, Union
-from speckle.converter.layers.utils import getVariantFromValue, traverseDict
+from typing import Any, Tuple, Union
+from speckle.converter.layers.utils import (
+    getLayerTransforms,
+    getVariantFromValue,
+    traverseDict,
+)
 
 from speckle.utils.panel_logging import logToUser
 
 from specklepy.objects import Base
 
+try:
+    from qgis.core import QgsFeatureRequest
+except ModuleNotFoundError:
+    pass
+
 
 def addFeatVariant(key, variant, value, f: "QgsFeature") -> "QgsFeature":
     try:
@@ -103,78 +112,90 @@ def updateFeat(feat: "QgsFeature", fields: "QgsFields", feature: Base) -> "QgsFe
     return feat
 
 
+def getLayerExistingHeights(
+    layer: "QgsVectorLayer", attribute: str, dataStorage: "DataStorage"
+) -> Tuple[int, Union[int, float, None]]:
+    """Get the number of numeric values of the extrusion attribute and the middle one, read once per layer."""
+    key = (layer.id(), attribute)
+    saved = getattr(dataStorage, "layerExistingHeights", None)
+    if saved is not None and saved[0] == key:
+        return saved[1]
+
+    # read only the attribute, without geometry
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([attribute], layer.fields())
+    all_existing_vals = [
+        f[attribute]
+        for f in layer.getFeatures(request)
+        if (
+            f[attribute] is not None
+            and (isinstance(f[attribute], float) or isinstance(f[attribute], int))
+        )
+    ]
+    height_average = None
+    if len(all_existing_vals) > 0:
+        height_average = all_existing_vals[int(len(all_existing_vals) / 2)]
+
+    heights = (len(all_existing_vals), height_average)
+    dataStorage.layerExistingHeights = (key, heights)
+    return heights
+
+
 def getPolygonFeatureHeight(
     feature: "QgsFeature", layer: "QgsVectorLayer", dataStorage: "DataStorage"
 ) -> Union[int, float, None]:
     height = None
-    ignore = False
     if dataStorage.savedTransforms is not None:
-        for item in dataStorage.savedTransforms:
-            layer_name = item.split("  ->  ")[0].split(" ('")[0]
-            transform_name = item.split("  ->  ")[1].lower()
-            if "ignore" in transform_name:
-                ignore = True
-
-            if layer_name == layer.name():
-                attribute = None
-                if " ('" in item:
-                    attribute = item.split(" ('")[1].split("') ")[0]
-
-                if attribute is None and ignore is False:
-                    logToUser(
-                        "Attribute for extrusion not selected",
-                        level=1,
-                        func=inspect.stack()[0][3],
-                    )
+        for record in getLayerTransforms(layer, dataStorage):
+            transform_name = record["kind"]
+            ignore = record["ignore"]
+            attribute = record["attribute"]
+
+            if attribute is None and ignore is False:
+                logToUser(
+                    "Attribute for extrusion not selected",
+                    level=1,
+                    func=inspect.stack()[0][3],
+                )
+                return None
+
+            # print("Apply transform: " + transform_name)
+            if "extrude" in transform_name and "polygon" in transform_name:
+                # additional check:
+                try:
+                    if dataStorage.project.crs().isGeographic():
+                        return None
+                except:
                     return None
 
-                # print("Apply transform: " + transform_name)
-                if "extrude" in transform_name and "polygon" in transform_name:
-                    # additional check:
-                    try:
-                        if dataStorage.project.crs().isGeographic():
+                try:
+                    value = feature[attribute]
+                    if (
+                        value is None or str(value) == "NULL"
+                    ):  # if attribute value invalid
+                        if ignore is True:
                             return None
-                    except:
-                        return None
-
-                    try:
-                        existing_height = float(feature[attribute])
-                        if (
-                            existing_height is None or str(feature[attribute]) == "NULL"
-                        ):  # if attribute value invalid
-                            if ignore is True:
-                                return None
-                            else:  # find approximate value
-                                all_existing_vals = [
-                                    f[attribute]
-                                    for f in layer.getFeatures()
-                                    if (
-                                        f[attribute] is not None
-                                        and (
-                                            isinstance(f[attribute], float)
-                                            or isinstance(f[attribute], int)
-                                        )
+                        else:  # find approximate value
+                            values_count, height_average = getLayerExistingHeights(
+                                layer, attribute, dataStorage
+                            )
+                            try:
+                                if values_count > 5:
+                                    height = random.randint(
+                                        height_average - 5, height_average + 5
                                     )
-                                ]
-                                try:
-                                    if len(all_existing_vals) > 5:
-                                        height_average = all_existing_vals[
-                                            int(len(all_existing_vals) / 2)
-                                        ]
-                                        height = random.randint(
-                                            height_average - 5, height_average + 5
-                                        )
-                                    else:
-                                        height = random.randint(10, 20)
-                                except:
+                                else:
                                     height = random.randint(10, 20)
-                        else:  # if acceptable value: reading from existing attribute
-                            height = existing_height
-
-                    except:  # if no Height attribute
-                        if ignore is True:
-                            height = None
-                        else:
-                            height = random.randint(10, 20)
+                            except:
+                                height = random.randint(10, 20)
+                    else:  # if acceptable value: reading from existing attribute
+                        height = float(value)
+
+                except:  # if no Height attribute
+                    if ignore is True:
+                        height = None
+                    else:
+                        height = random.randint(10, 20)
 
     return height
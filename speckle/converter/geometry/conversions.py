@@ -21,7 +21,6 @@ try:
         QgsVectorLayer,
         QgsFeature,
         QgsUnitTypes,
-        QgsCoordinateTransform,
     )
 except ModuleNotFoundError:
     pass
@@ -73,16 +72,14 @@ from speckle.converter.layers.utils import (
 
 
 def convertToSpeckle(
-    feature: "QgsFeature", layer: "QgsVectorLayer" or "QgsRasterLayer", dataStorage
+    feature: "QgsFeature",
+    layer: "QgsVectorLayer" or "QgsRasterLayer",
+    dataStorage,
+    xform: Union["QgsCoordinateTransform", None] = None,
 ) -> Tuple[Union[Base, Sequence[Base], None], Union[int, None]]:
-    """Converts the provided layer feature to Speckle objects"""
+    """Converts the provided layer feature to Speckle objects, xform is the layer-to-project transform (once per layer)"""
     try:
         iterations = 0
-        sourceCRS = layer.crs()
-        targetCRS = dataStorage.project.crs()
-        xform = None
-        if sourceCRS != targetCRS:
-            xform = QgsCoordinateTransform(sourceCRS, targetCRS, dataStorage.project)
 
         geom_original: Union[QgsGeometry, QgsAbstractGeometry] = feature.geometry()
 
@@ -197,7 +194,7 @@ def convertToSpeckle(
                         )
                     else:
                         translationZaxis = getZaxisTranslation(
-                            layer, boundaryPts, dataStorage
+                            layer, boundaryPts, dataStorage, feature
                         )
                         if translationZaxis is None:
                             logToUser(
@@ -231,7 +228,7 @@ def convertToSpeckle(
 
             else:
                 result = []
-                for poly in geom.parts():
+                for part_index, poly in enumerate(geom.parts()):
                     try:
                         boundaryPts = [
                             v[1] for v in enumerate(poly.exteriorRing().vertices())
@@ -264,7 +261,7 @@ def convertToSpeckle(
                             )
                         else:
                             translationZaxis = getZaxisTranslation(
-                                layer, boundaryPts, dataStorage
+                                layer, boundaryPts, dataStorage, feature, part_index
                             )
                             if translationZaxis is None:
                                 logToUser(
@@ -1,6 +1,7 @@
 import inspect
 import math
 from typing import List, Tuple, Union
+import numpy as np
 from specklepy.objects.geometry import Mesh, Point
 from specklepy.objects.other import RenderMaterial
 
@@ -147,14 +148,21 @@ def fill_mesh_parts(w: shapefile.Writer, mesh: Mesh, geom_id: str, dataStorage):
 
 
 def constructMeshFromRaster(
-    vertices: List[Union[float, int]],
-    faces: List[int],
-    colors: Union[List[int], None],
+    vertices: Union[List[Union[float, int]], np.ndarray],
+    faces: Union[List[int], np.ndarray],
+    colors: Union[List[int], np.ndarray, None],
     dataStorage,
 ):
     try:
         if vertices is None or faces is None:
             return None
+        # Mesh only accepts lists: convert the arrays in one go, no per-item loops
+        if isinstance(vertices, np.ndarray):
+            vertices = vertices.tolist()
+        if isinstance(faces, np.ndarray):
+            faces = faces.tolist()
+        if isinstance(colors, np.ndarray):
+            colors = colors.tolist()
         mesh = Mesh.create(vertices, faces, colors)
         mesh.units = "m"
         return mesh
@@ -10,9 +10,11 @@ except ModuleNotFoundError:
 
 from specklepy.objects.geometry import Point
 from speckle.converter.geometry.utils import (
+    apply_offsets_rotation_on_send_array,
     apply_pt_offsets_rotation_on_send,
     transform_speckle_pt_on_receive,
     apply_pt_transform_matrix,
+    getGeometryCoordinates,
 )
 from plugin_utils.helpers import get_scale_factor
 from speckle.converter.layers.symbology import featureColorfromNativeRenderer
@@ -55,6 +57,26 @@ def pointToSpeckle(
         return None
 
 
+def pointsToSpeckleArray(vertices, dataStorage) -> np.ndarray:
+    """Returns an (N,3) array of QgsPoint coordinates, with CRS offsets and rotation applied."""
+    coords = []
+    for pt in vertices:
+        if isinstance(pt, QgsPointXY):
+            coords.append([pt.x(), pt.y(), 0])
+        else:
+            z = pt.z()  # when unset, z() returns "nan"
+            coords.append([pt.x(), pt.y(), 0 if math.isnan(z) else z])
+    coords = np.array(coords, dtype=np.float64).reshape(-1, 3)
+    return apply_offsets_rotation_on_send_array(coords, dataStorage)
+
+
+def geometryToSpeckleArray(geom, dataStorage, xform=None) -> np.ndarray:
+    """Returns an (N,3) array of all vertex coordinates of the QgsAbstractGeometry, with CRS offsets and rotation applied."""
+    coords = getGeometryCoordinates(geom, xform)
+    coords[np.isnan(coords[:, 2]), 2] = 0
+    return apply_offsets_rotation_on_send_array(coords, dataStorage)
+
+
 def pointToNative(pt: Point, dataStorage) -> "QgsPoint":
     """Converts a Speckle Point to QgsPoint"""
     try:
@@ -14,11 +14,12 @@ try:
         QgsFeature,
         QgsVectorLayer,
         QgsCoordinateReferenceSystem,
+        QgsWkbTypes,
     )
 except ModuleNotFoundError:
     pass
 
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 
 from specklepy.objects.geometry import Point, Line, Polyline, Arc, Polycurve
 from specklepy.objects import Base
@@ -36,11 +37,9 @@ from speckle.converter.geometry.utils import (
 )
 
 # from speckle.converter.geometry.utils import *
+from speckle.converter.layers.ElevationSampler import getElevationSampler
 from speckle.converter.layers.utils import (
-    get_raster_stats,
-    getArrayIndicesFromXY,
     getElevationLayer,
-    getRasterArrays,
     moveVertically,
     reprojectPt,
 )
@@ -141,39 +140,106 @@ def polygonToSpeckleMesh(
         return None
 
 
-def getZaxisTranslation(layer, boundaryPts, dataStorage):
+def getPartsZaxisTranslations(
+    heights: np.ndarray, part_starts: List[int], first_z: List[float]
+) -> List[Union[float, None]]:
+    """Get translations on elevation of polygon parts from the sampled heights of all their points, listed part by part."""
+    # minimum per part, ignoring NaN (NaN if all heights of the part are NaN)
+    min_heights = np.fmin.reduceat(
+        np.asarray(heights, dtype=np.float64), np.array(part_starts, dtype=np.int64)
+    )
+    translations = []
+    for min_height, z in zip(min_heights.tolist(), first_z):
+        if np.isnan(min_height):
+            translations.append(None)
+        elif np.isnan(z):  # for flat polygons with z=0
+            translations.append(min_height)
+        else:
+            translations.append(min_height - z)
+    return translations
+
+
+def getLayerZaxisTranslations(
+    layer: "QgsVectorLayer", dataStorage
+) -> Dict[Tuple[str, int, int], Union[float, None]]:
+    """Get translations on elevation for all polygon parts of the layer: all boundaries are reprojected and sampled at once."""
+    translations = {}
+    elevationLayer = getElevationLayer(dataStorage)
+    sampler = getElevationSampler(elevationLayer, dataStorage)
+    if sampler is None:
+        return translations
+    try:
+        keys = []
+        first_z = []
+        part_starts = []
+        xs = []
+        ys = []
+        for feature in layer.getFeatures():
+            geom = feature.geometry().constGet()
+            if geom is None:
+                continue
+            if QgsWkbTypes.isSingleType(geom.wkbType()):
+                parts = [geom]
+            else:
+                parts = list(geom.parts())
+
+            for part_index, poly in enumerate(parts):
+                try:
+                    boundaryPts = [v for v in poly.exteriorRing().vertices()]
+                except:
+                    boundaryPts = [v for v in poly.vertices()]
+                if len(boundaryPts) == 0:
+                    continue
+                keys.append((layer.id(), feature.id(), part_index))
+                first_z.append(boundaryPts[0].z())
+                part_starts.append(len(xs))
+                xs.extend([pt.x() for pt in boundaryPts])
+                ys.extend([pt.y() for pt in boundaryPts])
+
+        if len(keys) == 0:
+            return translations
+
+        posX, posY = transform.transformArrays(
+            dataStorage.project, xs, ys, layer.crs(), elevationLayer.crs()
+        )
+        heights = sampler.sample(posX, posY)
+        translations = dict(
+            zip(keys, getPartsZaxisTranslations(heights, part_starts, first_z))
+        )
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3])
+    return translations
+
+
+def getZaxisTranslation(layer, boundaryPts, dataStorage, feature=None, part: int = 0):
+    # use the values calculated for the whole layer, if available
+    translations = getattr(dataStorage, "layerZaxisTranslations", None)
+    if feature is not None and translations is not None:
+        key = (layer.id(), feature.id(), part)
+        if key in translations:
+            return translations[key]
+
     #### check if elevation is applied and layer exists:
     elevationLayer = getElevationLayer(dataStorage)
     translationValue = None
-    
-    if elevationLayer is not None:
-        all_arrays, all_mins, all_maxs, all_na = getRasterArrays(elevationLayer)
-        settings_elevation_layer = get_raster_stats(elevationLayer)
-        allElevations = []
+
+    sampler = getElevationSampler(elevationLayer, dataStorage)
+    if sampler is not None:
+        posX = []
+        posY = []
         for pt in boundaryPts:
-            # posX, posY = reprojectPt(
-            #    pt.x(), pt.y(), polygonWkt, polygonProj, rasterWkt, rasterProj
-            # )
             reprojected_pt = transform.transform(
                 dataStorage.project,
                 QgsPointXY(pt.x(), pt.y()),
                 layer.crs(),
                 elevationLayer.crs(),
             )
-            posX = reprojected_pt.x()
-            posY = reprojected_pt.y()
-            index1, index2, remainder1, remainder2 = getArrayIndicesFromXY(
-                settings_elevation_layer, posX, posY
-            )
-            # print("___finding elevation__")
-            # print(posX)
-            # print(index1)
+            posX.append(reprojected_pt.x())
+            posY.append(reprojected_pt.y())
 
-            if index1 is None:
-                continue
-            else:
-                h = all_arrays[0][index1][index2]
-                allElevations.append(h)
+        # heights of all points at once, from the cached elevation blocks
+        heights = sampler.sample(np.array(posX), np.array(posY))
+        allElevations = heights[~np.isnan(heights)].tolist()
 
         if len(allElevations) == 0:
             translationValue = None
@@ -214,9 +280,8 @@ def polygonToSpeckle(
     polygon = GisPolygonGeometry(units="m")
     iterations = 0
     try:
-        geom = geom_original.clone()
         boundary, voidsNative = getPolyBoundaryVoids(
-            geom, feature, layer, dataStorage, xform
+            geom_original, feature, layer, dataStorage, xform
         )
 
         if projectZval is not None:
@@ -255,7 +320,15 @@ def polygonToSpeckle(
         polygon.boundary = boundary
         polygon.voids = voids
         iterations, vertices, faces, colors, iterations = meshPartsFromPolygon(
-            polyBorder, voidsAsPts, 0, feature, geom, layer, height, dataStorage, xform
+            polyBorder,
+            voidsAsPts,
+            0,
+            feature,
+            geom_original,
+            layer,
+            height,
+            dataStorage,
+            xform,
         )
 
         mesh = constructMesh(vertices, faces, colors, dataStorage)
@@ -346,7 +419,7 @@ def getPolyBoundaryVoids(
 
         if isinstance(geom_original, QgsGeometry):
             geom_original = geom_original.constGet()
-        geom = geom_original.clone()
+        geom = geom_original  # only read: rings are transformed as copies
 
         try:
             extRing = geom.exteriorRing()
@@ -14,7 +14,12 @@ from specklepy.objects.geometry import (
     Polycurve,
     Plane,
 )
-from speckle.converter.geometry.point import pointToNative, pointToSpeckle
+from speckle.converter.geometry.point import (
+    pointToNative,
+    pointToSpeckle,
+    pointsToSpeckleArray,
+    geometryToSpeckleArray,
+)
 
 try:
     from qgis.core import (
@@ -46,50 +51,45 @@ from speckle.utils.panel_logging import logToUser
 
 
 def polylineFromVerticesToSpeckle(
-    vertices: Union[List[Point], "QgsVertexIterator"],
+    vertices: Union[List[Point], "QgsVertexIterator", np.ndarray],
     closed: bool,
     feature: "QgsFeature",
     layer: "QgsVectorLayer",
     dataStorage,
 ):
-    """Returns a Speckle Polyline given a list of QgsPoint instances and a boolean indicating if it's closed or not."""
+    """Returns a Speckle Polyline given a list of QgsPoint instances (or their Speckle coordinates array) and a boolean indicating if it's closed or not."""
     try:
-        specklePts: List[Point] = []
-        if isinstance(vertices, list):
+        if isinstance(vertices, np.ndarray):
+            coords = vertices
+            units = "m"
+        elif isinstance(vertices, list):
             if len(vertices) > 0 and isinstance(vertices[0], Point):
-                specklePts = vertices
+                coords = np.array(
+                    [[pt.x, pt.y, pt.z] for pt in vertices], dtype=np.float64
+                )
+                units = vertices[0].units
             else:
-                for pt in vertices:
-                    speckle_pt = pointToSpeckle(pt, feature, layer, dataStorage)
-                    if speckle_pt is not None:
-                        specklePts.append(speckle_pt)
+                coords = pointsToSpeckleArray(vertices, dataStorage)
+                units = "m"
         elif isinstance(vertices, QgsVertexIterator):
-            for pt in vertices:
-                speckle_pt = pointToSpeckle(pt, feature, layer, dataStorage)
-                if speckle_pt is not None:
-                    specklePts.append(speckle_pt)
+            coords = pointsToSpeckleArray(vertices, dataStorage)
+            units = "m"
         else:
             return None
 
-        if len(specklePts) == 0 or specklePts[0] is None:
+        if len(coords) == 0:
             logToUser("Polyline conversion failed", level=2)
             return
 
+        # don't repeat the first point of a closed polyline
+        if closed and len(coords) > 1 and np.array_equal(coords[0], coords[-1]):
+            coords = coords[:-1]
+
         # TODO: Replace with `from_points` function when fix is pushed.
         polyline = Polyline()
-        polyline.value = []
+        polyline.value = coords.reshape(-1).tolist()
         polyline.closed = closed
-        polyline.units = specklePts[0].units
-        for i, point in enumerate(specklePts):
-            if (
-                closed
-                and i == len(specklePts) - 1
-                and specklePts[0].x == specklePts[len(specklePts) - 1].x
-                and specklePts[0].y == specklePts[len(specklePts) - 1].y
-                and specklePts[0].z == specklePts[len(specklePts) - 1].z
-            ):
-                continue
-            polyline.value.extend([point.x, point.y, point.z])
+        polyline.units = units
 
         col = featureColorfromNativeRenderer(feature, layer)
         polyline["displayStyle"] = {}
@@ -111,11 +111,10 @@ def unknownLineToSpeckle(
     try:
         if isinstance(poly_original, QgsGeometry):
             poly_original = poly_original.constGet()
-        poly = poly_original.clone()
-        
+        poly = poly_original  # not modified, transformed copies are created if needed
+
         if poly.wkbType() == 10:  # CurvePolygon
-            # actualGeom = poly.constGet()
-            actualGeom = actualGeom.segmentize()
+            actualGeom = poly.segmentize()
             if xform is not None:
                 actualGeom.transform(xform)
             return polylineToSpeckle(actualGeom, feature, layer, dataStorage)
@@ -125,11 +124,13 @@ def unknownLineToSpeckle(
         elif isinstance(poly, QgsCircularString):
             return arcToSpeckle(poly, feature, layer, dataStorage, xform)
         else:
-            if xform is not None:
-                poly.transform(xform)
             return polylineFromVerticesToSpeckle(
-                poly.vertices(), closed, feature, layer, dataStorage
-            )  # initial method
+                geometryToSpeckleArray(poly, dataStorage, xform),
+                closed,
+                feature,
+                layer,
+                dataStorage,
+            )
 
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
@@ -161,7 +162,7 @@ def compoudCurveToSpeckle(
 def anyLineToSpeckle(geom_original, feature, layer, dataStorage, xform=None):
     if isinstance(geom_original, QgsGeometry):
         geom_original = geom_original.constGet()
-    geom = geom_original.clone()
+    geom = geom_original  # not modified, transformed copies are created if needed
 
     type = geom.wkbType()
     if (
@@ -192,9 +193,7 @@ def anyLineToSpeckle(geom_original, feature, layer, dataStorage, xform=None):
             result = compoudCurveToSpeckle(geom, feature, layer, dataStorage, xform)
             # return None
     else:
-        if xform is not None:
-            geom.transform(xform)
-        result = polylineToSpeckle(geom, feature, layer, dataStorage)
+        result = polylineToSpeckle(geom, feature, layer, dataStorage, xform)
 
     result = addCorrectUnits(result, dataStorage)
     return result
@@ -205,6 +204,7 @@ def polylineToSpeckle(
     feature: "QgsFeature",
     layer: "QgsVectorLayer",
     dataStorage,
+    xform=None,
 ):
     """Converts a QgsLineString to Speckle"""
     try:
@@ -214,7 +214,11 @@ def polylineToSpeckle(
             closed = False
 
         polyline = polylineFromVerticesToSpeckle(
-            poly.vertices(), closed, feature, layer, dataStorage
+            geometryToSpeckleArray(poly, dataStorage, xform),
+            closed,
+            feature,
+            layer,
+            dataStorage,
         )
 
         return polyline
@@ -1,4 +1,7 @@
 import inspect
+from typing import Dict, Tuple, Union
+
+import numpy as np
 
 try:
     from qgis.core import (
@@ -11,11 +14,56 @@ try:
         QgsCoordinateTransform,
         QgsPointXY,
     )
+    from osgeo import osr
 except ModuleNotFoundError:
     pass
 
 from speckle.utils.panel_logging import logToUser
 
+# coordinate transforms reused during one send or receive operation
+_transform_cache: Dict[tuple, "QgsCoordinateTransform"] = {}
+
+
+def getCrsKey(crs: "QgsCoordinateReferenceSystem") -> str:
+    """Get the CRS identifier: authid, or WKT for custom and user-defined CRSs."""
+    authid = crs.authid()
+    if authid and not authid.startswith("USER:"):
+        return authid
+    return crs.toWkt()
+
+
+def getCoordinateTransform(
+    crsSrc: "QgsCoordinateReferenceSystem",
+    crsDest: "QgsCoordinateReferenceSystem",
+    project: "QgsProject",
+) -> "QgsCoordinateTransform":
+    """Get the transform between the CRSs, created once per send or receive for the same CRSs and transform context."""
+    transformContext = project.transformContext()
+    key = (
+        getCrsKey(crsSrc),
+        getCrsKey(crsDest),
+        transformContext.calculateCoordinateOperation(crsSrc, crsDest),
+    )
+    xform = _transform_cache.get(key)
+    if xform is None:
+        xform = QgsCoordinateTransform(crsSrc, crsDest, transformContext)
+        _transform_cache[key] = xform
+    return xform
+
+
+def getLayerTransformToProject(
+    layer: "QgsMapLayer", project: "QgsProject"
+) -> Union["QgsCoordinateTransform", None]:
+    """Get the transform from the layer CRS to the project CRS, None if they are the same."""
+    if layer.crs() == project.crs():
+        return None
+    return getCoordinateTransform(layer.crs(), project.crs(), project)
+
+
+def clearTransformCache():
+    """Remove the transforms kept since the start of the last send or receive."""
+    _transform_cache.clear()
+
 
 def transform(
     project: "QgsProject",
@@ -25,8 +73,7 @@ def transform(
 ) -> "QgsPointXY":
     """Transforms a QgsPointXY from the source CRS to the destination."""
     try:
-        transformContext = project.transformContext()
-        xform = QgsCoordinateTransform(crsSrc, crsDest, transformContext)
+        xform = getCoordinateTransform(crsSrc, crsDest, project)
 
         # forward transformation: src -> dest
         dest = xform.transform(
@@ -36,3 +83,45 @@ def transform(
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
         return
+
+
+def transformArrays(
+    project: "QgsProject",
+    xs: np.ndarray,
+    ys: np.ndarray,
+    crsSrc: "QgsCoordinateReferenceSystem",
+    crsDest: "QgsCoordinateReferenceSystem",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Transforms arrays of X and Y coordinates from the source CRS to the destination in one call."""
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if crsSrc == crsDest or len(xs) == 0:
+        return xs, ys
+    try:
+        srs_src = osr.SpatialReference()
+        srs_src.ImportFromWkt(crsSrc.toWkt())
+        srs_src.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        srs_dest = osr.SpatialReference()
+        srs_dest.ImportFromWkt(crsDest.toWkt())
+        srs_dest.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+        # use the same coordinate operation as QGIS, if set in the project
+        options = osr.CoordinateTransformationOptions()
+        operation = project.transformContext().calculateCoordinateOperation(
+            crsSrc, crsDest
+        )
+        if operation:
+            options.SetOperation(operation)
+        xform = osr.CreateCoordinateTransformation(srs_src, srs_dest, options)
+
+        points = np.array(xform.TransformPoints(np.column_stack([xs, ys]).tolist()))
+        return points[:, 0], points[:, 1]
+    except Exception as e:
+        # fallback: one QgsCoordinateTransform for all points
+        logToUser(e, level=1, func=inspect.stack()[0][3])
+        xform = getCoordinateTransform(crsSrc, crsDest, project)
+        points = [xform.transform(QgsPointXY(x, y)) for x, y in zip(xs, ys)]
+        return (
+            np.array([pt.x() for pt in points], dtype=np.float64),
+            np.array([pt.y() for pt in points], dtype=np.float64),
+        )
@@ -21,7 +21,6 @@ from geovoronoi import voronoi_regions_from_coords
 
 try:
     from qgis.core import (
-        QgsCoordinateTransform,
         Qgis,
         QgsPointXY,
         QgsGeometry,
@@ -38,9 +37,11 @@ try:
 except ModuleNotFoundError:
     pass
 
+from speckle.converter.geometry.transform import getCoordinateTransform
 from speckle.utils.panel_logging import logToUser
 
 import numpy as np
+import shapely
 
 
 def cross_product(
@@ -127,6 +128,42 @@ def projectToPolygon(
     return z
 
 
+def getGeometryCoordinates(geom: Any, xform=None) -> np.ndarray:
+    """Returns an (N,3) array of raw vertex coordinates of the QgsAbstractGeometry, z is NaN when unset."""
+    if xform is not None:
+        geom = geom.clone()
+        geom.transform(xform)
+    try:
+        # read all coordinates at once from WKB
+        return shapely.get_coordinates(
+            shapely.from_wkb(bytes(geom.asWkb())), include_z=True
+        )
+    except Exception:
+        # e.g. geometry types not readable by shapely
+        return np.array(
+            [[pt.x(), pt.y(), pt.z()] for pt in geom.vertices()], dtype=np.float64
+        ).reshape(-1, 3)
+
+
+def getRingPointsMask(
+    coords: np.ndarray, coef: Union[int, None], candidates: np.ndarray
+) -> np.ndarray:
+    """Mask of the ring points to keep: no repeated 1st point, only every coef-th point."""
+    keep = candidates.copy()
+    if coef is not None:
+        # don't add points, which are in-between specified step (coeff)
+        # e.g. if coeff=5, we skip ponts 1,2,3,4, but add points 0 and 5
+        keep &= np.arange(len(coords)) % coef == 0
+    if keep.any():
+        # don't repeat 1st point
+        first = int(np.argmax(keep))
+        keep[first + 1 :] &= ~(
+            (coords[first + 1 :, 0] == coords[first, 0])
+            & (coords[first + 1 :, 1] == coords[first, 1])
+        )
+    return keep
+
+
 def getPolyPtsSegments(
     geom: Any, dataStorage: "DataStorage", coef: Union[int, None] = None, xform=None
 ):
@@ -134,46 +171,27 @@ def getPolyPtsSegments(
     vertices3d = []
     segmList = []
     holes = []
-    if xform is not None:
-        geom.transform(xform)
     try:
         extRing = geom.exteriorRing()
-        pt_iterator = extRing.vertices()
     except:
         try:
             extRing = geom.constGet().exteriorRing()
-            pt_iterator = extRing.vertices()
         except:
-            pt_iterator = geom.vertices()
+            extRing = geom
 
     # get boundary points and segments
-    pointListLocalOuter = []
+    coordsOuter = getGeometryCoordinates(extRing, xform)
+    coordsOuter = coordsOuter[
+        getRingPointsMask(coordsOuter, coef, np.ones(len(coordsOuter), dtype=bool))
+    ]
+    pointListLocalOuter = {
+        (x, y, None if math.isnan(z) else z) for x, y, z in coordsOuter.tolist()
+    }
     startLen = len(vertices)
-    for i, pt in enumerate(pt_iterator):
-        if (
-            len(pointListLocalOuter) > 0
-            and pt.x() == pointListLocalOuter[0].x()
-            and pt.y() == pointListLocalOuter[0].y()
-        ):
-            # don't repeat 1st point
-            pass
-        elif coef is None:
-            pointListLocalOuter.append(pt)
-        else:
-            if i % coef == 0:
-                pointListLocalOuter.append(pt)
-            else:
-                # don't add points, which are in-between specified step (coeff)
-                # e.g. if coeff=5, we skip ponts 1,2,3,4, but add points 0 and 5
-                pass
-
-    for i, pt in enumerate(pointListLocalOuter):
-        x, y = apply_pt_offsets_rotation_on_send(pt.x(), pt.y(), dataStorage)
+    coords = apply_offsets_rotation_on_send_array(coordsOuter, dataStorage)
+    for i, (x, y, z) in enumerate(coords.tolist()):
         vertices.append([x, y])
-        try:
-            vertices3d.append([x, y, pt.z()])
-        except:
-            vertices3d.append([x, y, 0])
+        vertices3d.append([x, y, z])
 
         if i > 0:
             segmList.append([startLen + i - 1, startLen + i])
@@ -187,49 +205,29 @@ def getPolyPtsSegments(
         intRingsNum = geom.numInteriorRings()
 
         for k in range(intRingsNum):
-            intRing = geom.interiorRing(k)
-            pt_iterator = intRing.vertices()
-
-            pt_list = list(pt_iterator)
-            pointListLocal = []
+            coordsInner = getGeometryCoordinates(geom.interiorRing(k), xform)
             startLen = len(vertices)
 
-            for i, pt in enumerate(pt_list):
-                if (
-                    len(pointListLocal) > 0
-                    and pt.x() == pointListLocal[0].x()
-                    and pt.y() == pointListLocal[0].y()
-                ):
-                    # don't repeat 1st point
-                    continue
-                elif pt not in pointListLocalOuter:
-                    # make sure it's not already included in the outer part of geometry
-
-                    if coef is None or len(pt_list) / coef < 5:
-                        # coef was calculated by the outer ring.
-                        # We need to make sure inner ring will have at least 4 points, otherwise ignore coeff.
-                        pointListLocal.append(pt)
-                    else:
-                        if i % coef == 0:
-                            pointListLocal.append(pt)
-                        else:
-                            # don't add points, which are in-between specified step (coeff)
-                            # e.g. if coeff=5, we skip ponts 1,2,3,4, but add points 0 and 5
-                            pass
-
-            if len(pointListLocal) > 2:
-                holes.append(
-                    [
-                        apply_pt_offsets_rotation_on_send(p.x(), p.y(), dataStorage)
-                        for p in pointListLocal
-                    ]
-                )
-            for i, pt in enumerate(pointListLocal):
-                x, y = apply_pt_offsets_rotation_on_send(pt.x(), pt.y(), dataStorage)
-                try:
-                    vertices3d.append([x, y, pt.z()])
-                except:
-                    vertices3d.append([x, y, None])
+            # make sure it's not already included in the outer part of geometry
+            candidates = np.array(
+                [
+                    (x, y, None if math.isnan(z) else z) not in pointListLocalOuter
+                    for x, y, z in coordsInner.tolist()
+                ],
+                dtype=bool,
+            )
+            # coef was calculated by the outer ring.
+            # We need to make sure inner ring will have at least 4 points, otherwise ignore coeff.
+            ringCoef = None if coef is None or len(coordsInner) / coef < 5 else coef
+            coordsInner = coordsInner[
+                getRingPointsMask(coordsInner, ringCoef, candidates)
+            ]
+
+            coords = apply_offsets_rotation_on_send_array(coordsInner, dataStorage)
+            if len(coords) > 2:
+                holes.append([tuple(xyz[:2]) for xyz in coords.tolist()])
+            for i, (x, y, z) in enumerate(coords.tolist()):
+                vertices3d.append([x, y, None if math.isnan(z) else z])
 
                 if i > 0:
                     segmList.append([startLen + i - 1, startLen + i])
@@ -762,33 +760,74 @@ def getArcNormal(poly: Arc, midPt: Point, dataStorage) -> Union[Vector, None]:
         return None
 
 
-def apply_pt_offsets_rotation_on_send(
-    x: float, y: float, dataStorage
-) -> Tuple[float, float]:  # on Send
-    try:
-        offset_x = dataStorage.crs_offset_x
-        offset_y = dataStorage.crs_offset_y
-        rotation = dataStorage.crs_rotation
-        if offset_x == offset_y == rotation == 0:
-            return x, y
-        if offset_x is None and offset_y is None and rotation is None:
-            return x, y
+# offsets and rotation of the last used CRS settings
+_send_offsets_rotation_cache: Dict[tuple, Tuple[float, float, float, float]] = {}
+
+
+def get_send_offsets_rotation(
+    dataStorage,
+) -> Union[Tuple[float, float, float, float], None]:
+    """Returns (offset_x, offset_y, cos, sin) of the CRS offsets and rotation applied on Send, or None if there is nothing to apply."""
+    offset_x = dataStorage.crs_offset_x
+    offset_y = dataStorage.crs_offset_y
+    rotation = dataStorage.crs_rotation
+    if offset_x == offset_y == rotation == 0:
+        return None
+    if offset_x is None and offset_y is None and rotation is None:
+        return None
 
-        if offset_x is not None and isinstance(offset_x, float):
-            x -= offset_x
-        if offset_y is not None and isinstance(offset_y, float):
-            y -= offset_y
+    # offsets are only applied if float: keep the type in the key
+    key = (offset_x, offset_y, rotation, type(offset_x), type(offset_y))
+    kernel = _send_offsets_rotation_cache.get(key)
+    if kernel is None:
+        if offset_x is None or not isinstance(offset_x, float):
+            offset_x = 0.0
+        if offset_y is None or not isinstance(offset_y, float):
+            offset_y = 0.0
+        cos_a, sin_a = 1.0, 0.0
         if (
             rotation is not None
             and (isinstance(rotation, float) or isinstance(rotation, int))
             and -360 < rotation < 360
         ):
             a = rotation * math.pi / 180
-            x2 = x * math.cos(a) + y * math.sin(a)
-            y2 = -x * math.sin(a) + y * math.cos(a)
-            x = x2
-            y = y2
-        return x, y
+            cos_a, sin_a = math.cos(a), math.sin(a)
+        kernel = (offset_x, offset_y, cos_a, sin_a)
+        _send_offsets_rotation_cache.clear()
+        _send_offsets_rotation_cache[key] = kernel
+    return kernel
+
+
+def apply_offsets_rotation_on_send_array(
+    coords: np.ndarray, dataStorage
+) -> np.ndarray:  # on Send
+    """Applies CRS offsets and rotation to X and Y of an (N,2) or (N,3) float array, in place."""
+    try:
+        kernel = get_send_offsets_rotation(dataStorage)
+        if kernel is None or len(coords) == 0:
+            return coords
+        offset_x, offset_y, cos_a, sin_a = kernel
+        x = coords[:, 0] - offset_x
+        y = coords[:, 1] - offset_y
+        coords[:, 0] = x * cos_a + y * sin_a
+        coords[:, 1] = -x * sin_a + y * cos_a
+        return coords
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3])
+        raise e
+
+
+def apply_pt_offsets_rotation_on_send(
+    x: float, y: float, dataStorage
+) -> Tuple[float, float]:  # on Send
+    try:
+        kernel = get_send_offsets_rotation(dataStorage)
+        if kernel is None:
+            return x, y
+        offset_x, offset_y, cos_a, sin_a = kernel
+        x -= offset_x
+        y -= offset_y
+        return x * cos_a + y * sin_a, -x * sin_a + y * cos_a
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
         raise e
@@ -887,7 +926,7 @@ def apply_pt_transform_matrix(pt: Point, dataStorage) -> Point:
 
 def apply_feature_crs_transform(f, sourceCRS, targetCRS, dataStorage):
     if sourceCRS != targetCRS:
-        xform = QgsCoordinateTransform(sourceCRS, targetCRS, dataStorage.project)
+        xform = getCoordinateTransform(sourceCRS, targetCRS, dataStorage.project)
         geometry = f.geometry()
         geometry.transform(xform)
         f.setGeometry(geometry)
@@ -896,6 +935,6 @@ def apply_feature_crs_transform(f, sourceCRS, targetCRS, dataStorage):
 
 def apply_qgis_geometry_crs_transform(geometry, sourceCRS, targetCRS, dataStorage):
     if sourceCRS != targetCRS:
-        xform = QgsCoordinateTransform(sourceCRS, targetCRS, dataStorage.project)
+        xform = getCoordinateTransform(sourceCRS, targetCRS, dataStorage.project)
         geometry.transform(xform)
     return geometry
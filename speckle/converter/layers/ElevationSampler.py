@@ -0,0 +1,151 @@
+import inspect
+import math
+from collections import OrderedDict
+from typing import Tuple, Union
+
+import numpy as np
+
+from speckle.converter.layers.utils import (
+    getArrayIndicesFromXYArrays,
+    getRasterSourceKey,
+    get_raster_stats,
+)
+from speckle.utils.panel_logging import logToUser
+
+try:
+    from qgis._core import QgsRasterLayer
+    from osgeo import gdal
+except ModuleNotFoundError:
+    pass
+
+# memory for the recently used blocks of the elevation layer
+ELEVATION_BLOCK_CACHE_BYTES = 268435456
+
+
+class ElevationSampler:
+    """Reads heights from the first band of an elevation layer block by block, keeping the recently used GDAL blocks in memory."""
+
+    def __init__(self, elevationLayer: "QgsRasterLayer"):
+        self.layer_id = elevationLayer.id()
+        self.source_key = getRasterSourceKey(elevationLayer)
+        self.settings = get_raster_stats(elevationLayer)
+
+        self.ds = gdal.Open(elevationLayer.source(), gdal.GA_ReadOnly)
+        self.band = self.ds.GetRasterBand(1)
+        self.noDataVal = self.band.GetNoDataValue()
+        self.size_x, self.size_y = self.ds.RasterXSize, self.ds.RasterYSize
+        self.block_x, self.block_y = self.band.GetBlockSize()
+        self.blocks_per_row = math.ceil(self.size_x / self.block_x)
+
+        block_bytes = self.block_x * self.block_y * 8  # stored as float64
+        self.max_blocks = max(1, int(ELEVATION_BLOCK_CACHE_BYTES / block_bytes))
+        self.blocks: OrderedDict = OrderedDict()
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.size_y, self.size_x
+
+    def isValidFor(self, elevationLayer: "QgsRasterLayer") -> bool:
+        """Check if the sampler still reads the current source of the layer."""
+        try:
+            return (
+                self.layer_id == elevationLayer.id()
+                and self.source_key == getRasterSourceKey(elevationLayer)
+            )
+        except:
+            return False
+
+    def close(self):
+        """Release the cached blocks and the dataset handle."""
+        self.blocks.clear()
+        self.band = None
+        self.ds = None
+
+    def getBlock(self, block_index: int) -> np.ndarray:
+        """Get heights of the block, NaN for NoData and extreme values."""
+        block = self.blocks.get(block_index)
+        if block is not None:
+            self.blocks.move_to_end(block_index)
+            return block
+
+        block_row, block_col = divmod(block_index, self.blocks_per_row)
+        x_off, y_off = block_col * self.block_x, block_row * self.block_y
+        block = self.band.ReadAsArray(
+            x_off,
+            y_off,
+            min(self.block_x, self.size_x - x_off),
+            min(self.block_y, self.size_y - y_off),
+        ).astype(np.float64)
+
+        const = float(-1 * math.pow(10, 30))
+        block[
+            (block < const)
+            | (block > -1 * const)
+            | (block == self.noDataVal)
+            | (np.isinf(block))
+        ] = np.nan
+
+        self.blocks[block_index] = block
+        if len(self.blocks) > self.max_blocks:
+            self.blocks.popitem(last=False)
+        return block
+
+    def sampleIndices(self, index1, index2) -> np.ndarray:
+        """Get heights at the array indices (row, column); NaN where the index is -1."""
+        index1, index2 = np.broadcast_arrays(
+            np.asarray(index1, dtype=np.int64), np.asarray(index2, dtype=np.int64)
+        )
+        heights = np.full(index1.shape, np.nan, dtype=np.float64)
+        valid = (index1 >= 0) & (index2 >= 0)
+        rows, cols = index1[valid], index2[valid]
+
+        block_indices = (rows // self.block_y) * self.blocks_per_row + (
+            cols // self.block_x
+        )
+        values = np.empty(len(rows), dtype=np.float64)
+        for block_index in np.unique(block_indices):
+            in_block = block_indices == block_index
+            block = self.getBlock(int(block_index))
+            values[in_block] = block[
+                rows[in_block] % self.block_y, cols[in_block] % self.block_x
+            ]
+        heights[valid] = values
+        return heights
+
+    def sample(self, xs, ys) -> np.ndarray:
+        """Get heights at the XY coordinates (in the elevation layer CRS); NaN outside of the layer."""
+        index1, index2 = getArrayIndicesFromXYArrays(self.settings, xs, ys)
+        return self.sampleIndices(index1, index2)
+
+    def __getitem__(self, indices):
+        # allows to use the sampler in place of the height array: sampler[index1, index2]
+        index1, index2 = indices
+        heights = self.sampleIndices(index1, index2)
+        if heights.ndim == 0:
+            return float(heights)
+        return heights
+
+
+def getElevationSampler(
+    elevationLayer: "QgsRasterLayer", dataStorage
+) -> Union[ElevationSampler, None]:
+    """Get the elevation sampler kept in dataStorage, re-created if the layer or its source changed."""
+    if elevationLayer is None:
+        return None
+    try:
+        sampler = getattr(dataStorage, "elevationSampler", None)
+        if sampler is None or not sampler.isValidFor(elevationLayer):
+            sampler = ElevationSampler(elevationLayer)
+            dataStorage.elevationSampler = sampler
+        return sampler
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3])
+        return None
+
+
+def clearElevationSampler(dataStorage):
+    """Close the elevation sampler kept in dataStorage, to call at the end of each send."""
+    sampler = getattr(dataStorage, "elevationSampler", None)
+    if sampler is not None:
+        sampler.close()
+        dataStorage.elevationSampler = None
@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Union
+
+try:
+    from osgeo import gdal
+except ModuleNotFoundError:
+    pass
+
+# max number of raster bands read at the same time
+RASTER_READ_THREADS = 4
+
+
+class RasterBandPool:
+    """Runs per-band raster reads in a bounded thread pool, each thread with its own GDAL dataset handle."""
+
+    def __init__(
+        self, path: str, band_count: int, open_options: Union[List[str], None] = None
+    ):
+        self.path = path
+        self.band_count = band_count
+        self.open_options = open_options or []
+        self.local = threading.local()
+        self.datasets = []
+        self.lock = threading.Lock()
+        self.executor = None
+        if band_count > 1 and RASTER_READ_THREADS > 1:
+            self.executor = ThreadPoolExecutor(
+                max_workers=min(band_count, RASTER_READ_THREADS)
+            )
+
+    def getDataset(self):
+        """Get the dataset handle of the current thread, opened on the first use."""
+        ds = getattr(self.local, "ds", None)
+        if ds is None:
+            ds = gdal.OpenEx(
+                self.path,
+                gdal.OF_RASTER | gdal.OF_READONLY,
+                open_options=self.open_options,
+            )
+            self.local.ds = ds
+            with self.lock:
+                self.datasets.append(ds)
+        return ds
+
+    def runOnBand(self, func: Callable, index: int):
+        return func(self.getDataset().GetRasterBand(index + 1), index)
+
+    def map(self, func: Callable) -> list:
+        """Call func(band, index) for every band, return the results in the band order."""
+        if self.executor is None:
+            return [self.runOnBand(func, index) for index in range(self.band_count)]
+        futures = [
+            self.executor.submit(self.runOnBand, func, index)
+            for index in range(self.band_count)
+        ]
+        return [future.result() for future in futures]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the threads and release the dataset handles."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        self.local = threading.local()
+        with self.lock:
+            self.datasets = []
@@ -20,6 +20,7 @@ from specklepy.objects.geometry import (
     Polyline,
 )
 import os
+import tempfile
 import time
 from datetime import datetime
 
@@ -45,7 +46,6 @@ try:
         QgsLayerTreeNode,
         QgsLayerTreeLayer,
         QgsCoordinateReferenceSystem,
-        QgsCoordinateTransform,
         QgsFeature,
         QgsFields,
         QgsSingleSymbolRenderer,
@@ -57,6 +57,7 @@ try:
     )
     from osgeo import (  # # C:\Program Files\QGIS 3.20.2\apps\Python39\Lib\site-packages\osgeo
         gdal,
+        gdal_array,
         osr,
     )
     from PyQt5.QtGui import QColor
@@ -87,6 +88,7 @@ from speckle.converter.layers.utils import (
     collectionsFromJson,
     colorFromSpeckle,
     colorFromSpeckle,
+    decodeRasterBandValues,
     generate_qgis_app_id,
     generate_qgis_raster_app_id,
     getDisplayValueList,
@@ -98,8 +100,17 @@ from speckle.converter.layers.utils import (
     tryCreateGroupTree,
     trySaveCRS,
     validateAttributeName,
+    getAttributesPlan,
+    getAppIdPrefix,
+    getLayerTransforms,
 )
 from speckle.converter.geometry.mesh import writeMeshToShp
+from speckle.converter.geometry.polygon import getLayerZaxisTranslations
+from speckle.converter.layers.ElevationSampler import clearElevationSampler
+from speckle.converter.geometry.transform import (
+    getCoordinateTransform,
+    getLayerTransformToProject,
+)
 
 from speckle.converter.layers.symbology import (
     vectorRendererToNative,
@@ -114,6 +125,9 @@ from speckle.utils.panel_logging import logToUser
 
 from plugin_utils.helpers import SYMBOL, UNSUPPORTED_PROVIDERS
 
+# received rasters are written as tiled, compressed GeoTIFFs
+RASTER_CREATION_OPTIONS = ["TILED=YES", "COMPRESS=DEFLATE", "BIGTIFF=IF_SAFER"]
+
 GEOM_LINE_TYPES = [
     "Objects.Geometry.Line",
     "Objects.Geometry.Polyline",
@@ -170,27 +184,22 @@ def convertSelectedLayersToSpeckle(
                 plugin=plugin.dockwidget,
             )
             try:
-                for item in plugin.dataStorage.savedTransforms:
-                    layer_name = item.split("  ->  ")[0].split(" ('")[0]
-                    transform_name = item.split("  ->  ")[1]
-                    if layer_name == layer.name():
-                        logToUser(
-                            f"Applying transformation to layer '{layer_name}': '{transform_name}'",
-                            level=0,
-                            plugin=plugin.dockwidget,
-                        )
+                for record in getLayerTransforms(layer, plugin.dataStorage):
+                    logToUser(
+                        f"Applying transformation to layer '{record['layer_name']}': '{record['name']}'",
+                        level=0,
+                        plugin=plugin.dockwidget,
+                    )
             except Exception as e:
                 print(e)
 
             if plugin.dataStorage.savedTransforms is not None:
-                for item in plugin.dataStorage.savedTransforms:
-                    layer_name = item.split("  ->  ")[0].split(" ('")[0]
-                    transform_name = item.split("  ->  ")[1].lower()
+                for record in getLayerTransforms(layer, plugin.dataStorage):
+                    transform_name = record["kind"]
 
                     # check all the conditions for transform
                     if (
                         isinstance(layer, QgsVectorLayer)
-                        and layer.name() == layer_name
                         and "extrude" in transform_name
                         and "polygon" in transform_name
                     ):
@@ -202,13 +211,11 @@ def convertSelectedLayersToSpeckle(
                             )
                             return None
 
-                        attribute = None
-                        if " ('" in item:
-                            attribute = item.split(" ('")[1].split("') ")[0]
+                        attribute = record["attribute"]
                         if (
                             attribute is None
                             or str(attribute) not in layer.fields().names()
-                        ) and "ignore" in transform_name:
+                        ) and record["ignore"] is True:
                             logToUser(
                                 "Attribute for extrusion not found",
                                 level=2,
@@ -218,7 +225,6 @@ def convertSelectedLayersToSpeckle(
 
                     elif (
                         isinstance(layer, QgsRasterLayer)
-                        and layer.name() == layer_name
                         and "elevation" in transform_name
                     ):
                         if plugin.dataStorage.project.crs().isGeographic():
@@ -253,6 +259,9 @@ def convertSelectedLayersToSpeckle(
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3], plugin=plugin.dockwidget)
         return baseCollection
+    finally:
+        # release the elevation layer dataset and its cached blocks
+        clearElevationSampler(dataStorage)
 
 
 def layerToSpeckle(
@@ -312,10 +321,10 @@ def layerToSpeckle(
         layerRenderer = rendererToSpeckle(renderer)
 
         if isinstance(selectedLayer, QgsVectorLayer):
-            fieldnames = []  # [str(field.name()) for field in selectedLayer.fields()]
+            # field names and value converters, shared by all features
+            attributesPlan = getAttributesPlan(selectedLayer.fields())
             attributes = Base()
             for field in selectedLayer.fields():
-                fieldnames.append(str(field.name()))
                 corrected = validateAttributeName(str(field.name()), [])
                 attribute_type = field.type()
                 r"""
@@ -362,19 +371,28 @@ def layerToSpeckle(
                     level=1,
                     plugin=plugin.dockwidget,
                 )
+            elif projectingApplied is True:
+                # project all polygons at once, features will look the values up
+                dataStorage.layerZaxisTranslations = getLayerZaxisTranslations(
+                    selectedLayer, dataStorage
+                )
 
             # write features
             all_errors_count = 0
+            dataStorage.layerExistingHeights = None  # read again for each send
+            appIdPrefix = getAppIdPrefix(selectedLayer)
+            xform = getLayerTransformToProject(selectedLayer, dataStorage.project)
             for i, f in enumerate(features):
                 dataStorage.latestActionFeaturesReport.append(
                     {"feature_id": str(i + 1), "obj_type": "", "errors": ""}
                 )
                 b = featureToSpeckle(
-                    fieldnames,
+                    attributesPlan,
                     f,
                     geomType,
                     selectedLayer,
                     plugin.dataStorage,
+                    xform,
                 )
                 # if b is None: continue
 
@@ -391,7 +409,9 @@ def layerToSpeckle(
                             g.voids = None
 
                 if isinstance(b, Base):
-                    b.applicationId = generate_qgis_app_id(selectedLayer, f)
+                    b.applicationId = generate_qgis_app_id(
+                        selectedLayer, f, appIdPrefix
+                    )
 
                 layerObjs.append(b)
                 if (
@@ -402,6 +422,9 @@ def layerToSpeckle(
                 ):
                     all_errors_count += 1
 
+            dataStorage.layerZaxisTranslations = None
+            dataStorage.layerExistingHeights = None
+
             # Convert layer to speckle
             layerBase = VectorLayer(
                 units=units_proj,
@@ -1895,6 +1918,9 @@ def rasterLayerToNative(layer: RasterLayer, streamBranch: str, nameBase: str, pl
 
         newName = layerName  # f'{streamBranch.split("_")[len(streamBranch.split("_"))-1]}_{layerName}'
 
+        # write the raster file here (worker thread), main thread only adds the layer
+        path = writeRasterLayerFile(layer, newName, streamBranch, plugin)
+
         plugin.dockwidget.signal_4.emit(
             {
                 "plugin": plugin,
@@ -1902,6 +1928,7 @@ def rasterLayerToNative(layer: RasterLayer, streamBranch: str, nameBase: str, pl
                 "newName": newName,
                 "streamBranch": streamBranch,
                 "layer": layer,
+                "path": path,
             }
         )
 
@@ -1911,16 +1938,23 @@ def rasterLayerToNative(layer: RasterLayer, streamBranch: str, nameBase: str, pl
         return
 
 
-def addRasterMainThread(obj: Tuple):
+def getRasterLayerNames(newName: str) -> Tuple[str, str]:
+    """Get names of the received raster file and layer."""
+    shortName = newName.split(SYMBOL)[len(newName.split(SYMBOL)) - 1][:50]
+    # print(f"Final short name: {shortName}")
     try:
-        finalName = ""
-        plugin = obj["plugin"]
-        layerName = obj["layerName"]
-        newName = obj["newName"]
-        streamBranch = obj["streamBranch"]
-        layer = obj["layer"]
-        plugin.dockwidget.msgLog.removeBtnUrl("cancel")
+        layerName = newName.split(shortName)[0] + shortName + "_Speckle"
+    except:
+        layerName = newName + "_Speckle"
+    finalName = shortName + "_Speckle"
+    return layerName, finalName
+
 
+def writeRasterLayerFile(
+    layer: RasterLayer, newName: str, streamBranch: str, plugin
+) -> Union[str, None]:
+    """Write received raster to a tiled, compressed GeoTIFF in its original data type, block by block."""
+    try:
         project: QgsProject = plugin.dataStorage.project
         dataStorage = plugin.dataStorage
 
@@ -1938,71 +1972,38 @@ def addRasterMainThread(obj: Tuple):
         except AttributeError as e:
             print(e)
 
-        shortName = newName.split(SYMBOL)[len(newName.split(SYMBOL)) - 1][:50]
-        # print(f"Final short name: {shortName}")
-        try:
-            layerName = newName.split(shortName)[0] + shortName + "_Speckle"
-        except:
-            layerName = newName + "_Speckle"
-        finalName = shortName + "_Speckle"
-
-        # report on receive:
-        dataStorage.latestActionLayers.append(finalName)
-        ###########################################
-        dummy = None
-        root = project.layerTreeRoot()
-        dataStorage.all_layers = getAllLayers(root)
-        if dataStorage.all_layers is not None:
-            if len(dataStorage.all_layers) == 0:
-                dummy = QgsVectorLayer(
-                    "Point?crs=EPSG:4326", "", "memory"
-                )  # do something to distinguish: stream_id_latest_name
-                crs = QgsCoordinateReferenceSystem(4326)
-                dummy.setCrs(crs)
-                project.addMapLayer(dummy, True)
-        #################################################
-
-        ######################## testing, only for receiving layers #################
+        layerName, finalName = getRasterLayerNames(newName)
         source_folder = project.absolutePath()
 
         feat = layer.elements[0]
 
-        vl = None
-        crs = QgsCoordinateReferenceSystem.fromWkt(
-            layer.crs.wkt
-        )  # moved up, because CRS of existing layer needs to be rewritten
+        crs = QgsCoordinateReferenceSystem.fromWkt(layer.crs.wkt)
         # try, in case of older version "rasterCrs" will not exist
         try:
             if layer.rasterCrs.wkt is None or layer.rasterCrs.wkt == "":
                 raise Exception
             crsRasterWkt = str(layer.rasterCrs.wkt)
-            crsRaster = QgsCoordinateReferenceSystem.fromWkt(
-                layer.rasterCrs.wkt
-            )  # moved up, because CRS of existing layer needs to be rewritten
+            crsRaster = QgsCoordinateReferenceSystem.fromWkt(layer.rasterCrs.wkt)
         except:
             crsRasterWkt = str(layer.crs.wkt)
             crsRaster = crs
-            logToUser(
-                f"Raster layer '{layer.name}' might have been sent from the older version of plugin. Try sending it again for more accurate results.",
-                level=1,
-                plugin=plugin.dockwidget,
-            )
-
-        srsid = trySaveCRS(crsRaster, streamBranch)
-        crs_new = QgsCoordinateReferenceSystem.fromSrsId(srsid)
-        authid = crs_new.authid()
 
         try:
             bandNames = feat.band_names
         except:
             bandNames = feat["Band names"]
-        bandValues = [feat["@(10000)" + name + "_values"] for name in bandNames]
+
+        # band values are either encoded chunks of native type, or lists of numbers
+        try:
+            bandValueTypes = feat.band_value_types
+        except:
+            bandValueTypes = None
 
         if source_folder == "":
-            p = (
-                os.path.expandvars(r"%LOCALAPPDATA%")
-                + "\\Temp\\Speckle_QGIS_temp\\"
-                + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            p = os.path.join(
+                tempfile.gettempdir(),
+                "Speckle_QGIS_temp",
+                datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
             )
             findOrCreatePath(p)
             source_folder = p
@@ -2018,42 +2019,34 @@ def addRasterMainThread(obj: Tuple):
 
         fn = path_fn + layerName + ".tif"  # arcpy.env.workspace + "\\" #
         # fn = source_folder + '/' + newName.replace("/","_") + '.tif' #'_received_raster.tif'
-        driver = gdal.GetDriverByName("GTiff")
-        # create raster dataset
+
         try:
-            ds = driver.Create(
-                fn,
-                xsize=feat.x_size,
-                ysize=feat.y_size,
-                bands=feat.band_count,
-                eType=gdal.GDT_Float32,
-            )
+            x_size, y_size = int(feat.x_size), int(feat.y_size)
         except:
-            ds = driver.Create(
-                fn,
-                xsize=feat["X pixels"],
-                ysize=feat["Y pixels"],
-                bands=feat["Band count"],
-                eType=gdal.GDT_Float32,
-            )
-
-        # Write data to raster band
-        # No data issue: https://gis.stackexchange.com/questions/389587/qgis-set-raster-no-data-value
-
+            x_size, y_size = int(feat["X pixels"]), int(feat["Y pixels"])
         try:
             b_count = int(feat.band_count)  # from 2.14
         except:
             b_count = feat["Band count"]
 
-        for i in range(b_count):
-            rasterband = np.array(bandValues[i])
-            try:
-                rasterband = np.reshape(rasterband, (feat.y_size, feat.x_size))
-            except Exception as e:
-                rasterband = np.reshape(
-                    rasterband, (feat["Y pixels"], feat["X pixels"])
-                )
+        # keep the original data type, if sent
+        eType = getRasterGdalType(bandValueTypes)
+        valuesType = gdal_array.GDALTypeCodeToNumericTypeCode(eType)
 
+        driver = gdal.GetDriverByName("GTiff")
+        # create raster dataset
+        ds = driver.Create(
+            fn,
+            xsize=x_size,
+            ysize=y_size,
+            bands=b_count,
+            eType=eType,
+            options=RASTER_CREATION_OPTIONS,
+        )
+
+        # Write data to raster band
+        # No data issue: https://gis.stackexchange.com/questions/389587/qgis-set-raster-no-data-value
+        for i in range(b_count):
             band = ds.GetRasterBand(
                 i + 1
             )  # https://pcjericks.github.io/py-gdalogr-cookbook/raster_layers.html
@@ -2071,7 +2064,15 @@ def addRasterMainThread(obj: Tuple):
             except:
                 pass
 
-            band.WriteArray(rasterband)  # or "rasterband.T"
+            writeRasterBandValues(
+                band,
+                feat,
+                bandNames[i],
+                None if bandValueTypes is None else bandValueTypes[i],
+                valuesType,
+                x_size,
+                y_size,
+            )
 
         # create GDAL transformation in format [top-left x coord, cell width, 0, top-left y coord, 0, cell height]
         pt = None
@@ -2112,7 +2113,8 @@ def addRasterMainThread(obj: Tuple):
                 level=2,
                 plugin=plugin.dockwidget,
             )
-            return
+            ds = None
+            return None
 
         try:  # if the CRS has offset props
             dataStorage.current_layer_crs_offset_x = layer.crs.offset_x
@@ -2128,7 +2130,7 @@ def addRasterMainThread(obj: Tuple):
 
         except AttributeError as e:
             print(e)
-        xform = QgsCoordinateTransform(crs, crsRaster, project)
+        xform = getCoordinateTransform(crs, crsRaster, project)
         pt.transform(xform)
         try:
             ds.SetGeoTransform(
@@ -2143,6 +2145,103 @@ def addRasterMainThread(obj: Tuple):
         ds.SetProjection(crsRasterWkt)
         # close the rater datasource by setting it equal to None
         ds = None
+        return fn
+
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3], plugin=plugin.dockwidget)
+        return None
+
+
+def getRasterGdalType(bandValueTypes: Union[List[str], None]) -> int:
+    """Get the GDAL type of the received raster: common type of the sent band values, or Float32."""
+    if bandValueTypes is None:
+        return gdal.GDT_Float32
+    # None if the type has no GDAL equivalent (e.g. int64 or int8 on older GDAL)
+    return (
+        gdal_array.NumericTypeCodeToGDALTypeCode(np.result_type(*bandValueTypes))
+        or gdal.GDT_Float32
+    )
+
+
+def writeRasterBandValues(
+    band,
+    feat: Base,
+    bandName: str,
+    bandValueType: Union[str, None],
+    valuesType,
+    x_size: int,
+    y_size: int,
+):
+    """Write the received values of the band (encoded chunks or a list of numbers) by blocks of whole rows."""
+    row_offset = 0
+    if bandValueType is not None:
+        for chunk in feat["@(1)" + bandName + "_values_encoded"]:
+            rows = decodeRasterBandValues([chunk], bandValueType)
+            rows = rows.reshape(-1, x_size).astype(valuesType, copy=False)
+            band.WriteArray(rows, 0, row_offset)
+            row_offset += rows.shape[0]
+    else:
+        bandValues = feat["@(10000)" + bandName + "_values"]
+        block_rows = max(1, band.GetBlockSize()[1])
+        for row_offset in range(0, y_size, block_rows):
+            rows = np.array(
+                bandValues[row_offset * x_size : (row_offset + block_rows) * x_size]
+            ).reshape(-1, x_size)
+            band.WriteArray(rows, 0, row_offset)
+
+
+def addRasterMainThread(obj: Tuple):
+    try:
+        finalName = ""
+        plugin = obj["plugin"]
+        newName = obj["newName"]
+        streamBranch = obj["streamBranch"]
+        layer = obj["layer"]
+        fn = obj["path"]
+        plugin.dockwidget.msgLog.removeBtnUrl("cancel")
+
+        project: QgsProject = plugin.dataStorage.project
+        dataStorage = plugin.dataStorage
+
+        layerName, finalName = getRasterLayerNames(newName)
+
+        # report on receive:
+        dataStorage.latestActionLayers.append(finalName)
+        if fn is None:
+            raise Exception(f"Raster file for layer '{layer.name}' was not written")
+        ###########################################
+        dummy = None
+        root = project.layerTreeRoot()
+        dataStorage.all_layers = getAllLayers(root)
+        if dataStorage.all_layers is not None:
+            if len(dataStorage.all_layers) == 0:
+                dummy = QgsVectorLayer(
+                    "Point?crs=EPSG:4326", "", "memory"
+                )  # do something to distinguish: stream_id_latest_name
+                crs = QgsCoordinateReferenceSystem(4326)
+                dummy.setCrs(crs)
+                project.addMapLayer(dummy, True)
+        #################################################
+
+        crs = QgsCoordinateReferenceSystem.fromWkt(
+            layer.crs.wkt
+        )  # moved up, because CRS of existing layer needs to be rewritten
+        # try, in case of older version "rasterCrs" will not exist
+        try:
+            if layer.rasterCrs.wkt is None or layer.rasterCrs.wkt == "":
+                raise Exception
+            crsRaster = QgsCoordinateReferenceSystem.fromWkt(
+                layer.rasterCrs.wkt
+            )  # moved up, because CRS of existing layer needs to be rewritten
+        except:
+            crsRaster = crs
+            logToUser(
+                f"Raster layer '{layer.name}' might have been sent from the older version of plugin. Try sending it again for more accurate results.",
+                level=1,
+                plugin=plugin.dockwidget,
+            )
+
+        trySaveCRS(crsRaster, streamBranch)
 
         raster_layer = QgsRasterLayer(fn, finalName, "gdal")
         project.addMapLayer(raster_layer, False)
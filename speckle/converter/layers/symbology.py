@@ -1,5 +1,6 @@
+import bisect
 import inspect
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 try:
     from qgis.core import (
@@ -34,84 +35,157 @@ from speckle.utils.panel_logging import logToUser
 # TODO QML format: https://gis.stackexchange.com/questions/202230/loading-style-qml-file-to-layer-via-pyqgis
 
 
+DEFAULT_FEATURE_COLOR = (255 << 24) + (245 << 16) + (245 << 8) + 245
+
+# feature color resolvers of the layers, built once per send
+_layer_color_resolvers: Dict[str, Callable] = {}
+
+
+def symbolColorToInt(color) -> int:
+    """Get ARGB integer of the QColor or "r,g,b" string."""
+    try:
+        r, g, b = color.getRgb()[:3]
+    except:
+        r, g, b = [int(i) for i in color.replace(" ", "").split(",")[:3]]
+    return (255 << 24) + (r << 16) + (g << 8) + b
+
+
+def getRangeLookup(ranges: List[Tuple[float, float]]) -> Callable:
+    """Get a function returning the index of the first (lower, upper) range containing the value, or None."""
+    order = sorted(range(len(ranges)), key=lambda i: (ranges[i][0], i))
+    lowers = [ranges[i][0] for i in order]
+    sorted_ranges = [ranges[i] for i in order]
+    non_overlapping = all(
+        sorted_ranges[i][0] < sorted_ranges[i + 1][0]
+        and sorted_ranges[i][1] <= sorted_ranges[i + 1][0]
+        for i in range(len(sorted_ranges) - 1)
+    )
+
+    def lookup(value) -> Union[int, None]:
+        if not non_overlapping:
+            for i, (lower, upper) in enumerate(ranges):
+                if value >= lower and value <= upper:
+                    return i
+            return None
+        # only the last 2 ranges starting below the value can contain it
+        # (2 if the value is on the shared boundary)
+        pos = bisect.bisect_right(lowers, value)
+        found = [
+            order[k]
+            for k in range(max(0, pos - 2), pos)
+            if value >= sorted_ranges[k][0] and value <= sorted_ranges[k][1]
+        ]
+        return min(found) if len(found) > 0 else None
+
+    return lookup
+
+
+def getCategorizedColorResolver(renderer, layer: "QgsVectorLayer") -> Callable:
+    """Get a function returning the color of the feature category, matched the same way as the category list order."""
+    color = DEFAULT_FEATURE_COLOR
+    sSymb = renderer.sourceSymbol()
+    if sSymb is not None:
+        color = symbolColorToInt(sSymb.color())
+    category = renderer.classAttribute()  # name of attribute used for classification
+
+    # first category with the value wins; values are compared as numbers where possible
+    numeric_colors = {}
+    text_colors = {}  # categories with non-numeric values
+    all_text_colors = {}  # all categories, for non-numeric feature values
+    other_color = None
+    for i, obj in enumerate(renderer.categories()):
+        obj_color = symbolColorToInt(obj.symbol().color())
+        try:
+            numeric_colors.setdefault(float(obj.value()), (i, obj_color))
+        except:
+            text_colors.setdefault(str(obj.value()), (i, obj_color))
+        all_text_colors.setdefault(str(obj.value()), (i, obj_color))
+        if str(obj.value()) == "None" or str(obj.value()) == "":  # other category
+            other_color = obj_color
+    if other_color is not None:
+        color = other_color
+
+    def resolve(feature: "QgsFeature") -> int:
+        try:
+            value = feature.attribute(category)
+        except:
+            logToUser(
+                f"Attribute '{category}' used for the layer '{layer.name()}' symbology is not found",
+                level=2,
+                func=inspect.stack()[0][3],
+            )
+            return DEFAULT_FEATURE_COLOR
+        try:
+            matches = [
+                numeric_colors.get(float(value)),
+                text_colors.get(str(value)),
+            ]
+        except:
+            matches = [all_text_colors.get(str(value))]
+        matches = [m for m in matches if m is not None]
+        if len(matches) > 0:
+            return min(matches)[1]
+        return color
+
+    return resolve
+
+
+def getGraduatedColorResolver(renderer) -> Callable:
+    """Get a function returning the color of the feature value range."""
+    color = symbolColorToInt(renderer.sourceSymbol().color())
+    if renderer.graduatedMethod() != 0:  # the styling is by size, not by color
+        return lambda feature: color
+
+    category = renderer.legendClassificationAttribute()
+    ranges = renderer.ranges()
+    range_colors = [symbolColorToInt(obj.symbol().color()) for obj in ranges]
+    lookup = getRangeLookup([(obj.lowerValue(), obj.upperValue()) for obj in ranges])
+
+    def resolve(feature: "QgsFeature") -> int:
+        index = lookup(feature.attribute(category))
+        return color if index is None else range_colors[index]
+
+    return resolve
+
+
+def getLayerColorResolver(layer: "QgsVectorLayer") -> Callable:
+    """Get the feature color function of the layer renderer, created once per send."""
+    resolver = _layer_color_resolvers.get(layer.id())
+    if resolver is not None:
+        return resolver
+
+    renderer = layer.renderer()
+    rendererType = renderer.type()
+    if rendererType == "singleSymbol":
+        color = symbolColorToInt(renderer.symbol().color())
+        resolver = lambda feature: color
+    elif rendererType == "categorizedSymbol":
+        resolver = getCategorizedColorResolver(renderer, layer)
+    elif rendererType == "graduatedSymbol":
+        resolver = getGraduatedColorResolver(renderer)
+    else:
+        # one color for the entire layer
+        resolver = lambda feature: DEFAULT_FEATURE_COLOR
+
+    _layer_color_resolvers[layer.id()] = resolver
+    return resolver
+
+
+def clearLayerColorResolvers():
+    """Remove the feature color functions kept since the start of the last send."""
+    _layer_color_resolvers.clear()
+
+
 def featureColorfromNativeRenderer(
     feature: "QgsFeature", layer: "QgsVectorLayer"
 ) -> int:
-    # case with one color for the entire layer
     try:
-        renderer = layer.renderer()
-        if (
-            renderer.type() == "categorizedSymbol"
-            or renderer.type() == "25dRenderer"
-            or renderer.type() == "invertedPolygonRenderer"
-            or renderer.type() == "mergedFeatureRenderer"
-            or renderer.type() == "RuleRenderer"
-            or renderer.type() == "nullSymbol"
-            or renderer.type() == "singleSymbol"
-            or renderer.type() == "graduatedSymbol"
-        ):
-            # get color value
-            color = QColor.fromRgb(245, 245, 245)
-            if renderer.type() == "singleSymbol":
-                color = renderer.symbol().color()
-            elif renderer.type() == "categorizedSymbol":
-                sSymb = renderer.sourceSymbol()
-                if sSymb is not None:
-                    color = sSymb.color()
-                category = (
-                    renderer.classAttribute()
-                )  # get the name of attribute used for classification
-                try:
-                    feature.attribute(category)
-                    renderer.categories()
-                except:
-                    logToUser(
-                        f"Attribute '{category}' used for the layer '{layer.name()}' symbology is not found",
-                        level=2,
-                        func=inspect.stack()[0][3],
-                    )
-                    return (255 << 24) + (245 << 16) + (245 << 8) + 245
-
-                for obj in renderer.categories():
-                    try:
-                        if float(obj.value()) == float(feature.attribute(category)):
-                            color = obj.symbol().color()
-                            break
-                    except:
-                        if str(obj.value()) == str(feature.attribute(category)):
-                            color = obj.symbol().color()
-                            break
-                    if (
-                        str(obj.value()) == "None" or str(obj.value()) == ""
-                    ):  # other category
-                        color = obj.symbol().color()
-            elif renderer.type() == "graduatedSymbol":
-                color = renderer.sourceSymbol().color()
-                category = (
-                    renderer.legendClassificationAttribute()
-                )  # get the name of attribute used for classification
-                if (
-                    renderer.graduatedMethod() == 0
-                ):  # if the styling is by color (not by size)
-                    for obj in renderer.ranges():
-                        if (
-                            feature.attribute(category) >= obj.lowerValue()
-                            and feature.attribute(category) <= obj.upperValue()
-                        ):
-                            color = obj.symbol().color()
-                            break
-            # construct RGB color
-            try:
-                r, g, b = color.getRgb()[:3]
-            except:
-                r, g, b = [int(i) for i in color.replace(" ", "").split(",")[:3]]
-            col = (255 << 24) + (r << 16) + (g << 8) + b
-            return col
-        else:
-            return (255 << 24) + (245 << 16) + (245 << 8) + 245
+        if layer is None:
+            return DEFAULT_FEATURE_COLOR
+        return getLayerColorResolver(layer)(feature)
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
-        return (255 << 24) + (245 << 16) + (245 << 8) + 245
+        return DEFAULT_FEATURE_COLOR
 
 
 def gradientColorRampToSpeckle(
@@ -1,9 +1,14 @@
+import base64
 import copy
 import hashlib
 import inspect
+import json
+import os
 import time
+import zlib
 from plugin_utils.helpers import SYMBOL
 from typing import Any, Dict, List, Tuple, Union
+from specklepy.core.helpers.speckle_path_provider import user_speckle_folder_path
 from specklepy.objects import Base
 from specklepy.objects.other import Collection
 from specklepy.objects.geometry import (
@@ -60,32 +65,73 @@ ATTRS_REMOVE = [
     "displayValue",
 ]
 
+# transform to save raster options for layers without an elevation transform
+RASTER_OPTIONS_TRANSFORM = "Raster send options"
+# level-of-detail options for raster transforms: max number of mesh cells
+RASTER_LOD_OPTIONS = {
+    "Full resolution": None,
+    "Max 1000000 cells": 1000000,
+    "Max 250000 cells": 250000,
+    "Max 50000 cells": 50000,
+}
+# option to still send band values of the original resolution with a reduced mesh
+RASTER_LOD_FULL_VALUES = "Full resolution values"
+# terrain simplification options for elevation-to-mesh transforms: max height error
+RASTER_SIMPLIFY_OPTIONS = {
+    "Simplified, tolerance 0.1": 0.1,
+    "Simplified, tolerance 0.5": 0.5,
+    "Simplified, tolerance 2": 2.0,
+}
+# raster mesh options to turn off the shared vertex grid or the skipping of NoData pixels
+RASTER_SEPARATE_VERTICES = "Separate pixel vertices"
+RASTER_KEEP_NODATA = "Keep NoData pixels"
+# raster option to send band values as compressed chunks of their native type
+RASTER_COMPACT_VALUES = "Compact band values"
+# separator of the raster transform options saved in the attribute slot of the record;
+# no ";", the saved transforms are joined with ";" in the project
+RASTER_OPTIONS_SEPARATOR = " + "
+
+# raster band values encoding: raw bytes of the native type, compressed;
+# size of uncompressed data per encoded chunk (whole rows are kept together)
+RASTER_VALUES_CHUNK_BYTES = 1048576
+
+# raster application IDs, cached by source file, size and modification time
+RASTER_APP_ID_CACHE_FILE = "qgis_raster_app_ids.json"
+RASTER_APP_ID_CACHE_SIZE = 1000
+_raster_app_id_cache = None
+
+# raster georeferencing stats, cached by source (and file modification time)
+_raster_stats_cache = {}
+
+
+def getAppIdPrefix(layer: Union["QgsRasterLayer", "QgsVectorLayer", None]):
+    """Get the hash of the layer properties used in the feature application IDs, to compute once per layer."""
+    prefix = hashlib.blake2b(digest_size=16)
+    if layer is not None:
+        fieldnames = [str(field.name()) for field in layer.fields()]
+        layer_props = [layer.id(), str(layer.wkbType())] + fieldnames
+        prefix.update("\x1f".join(layer_props).encode("utf-8"))
+    return prefix
+
 
 def generate_qgis_app_id(
     layer: Union["QgsRasterLayer", "QgsVectorLayer"],
     f: "QgsFeature",
+    prefix=None,
 ):
     """Generate unique ID for Vector feature."""
     try:
+        if prefix is None:
+            prefix = getAppIdPrefix(layer)
+        id_hash = prefix.copy()
 
         try:
-            geoms = str(f.geometry())
+            id_hash.update(bytes(f.geometry().asWkb()))
         except Exception as e:
-            geoms = ""
-
-        if layer is not None:
-            layer_id = layer.id()
-            layer_geom_type = str(layer.wkbType())
-            fieldnames = [str(field.name()) for field in layer.fields()]
-            props = [str(f[prop]) for prop in fieldnames]
-        else:
-            layer_id = ""
-            layer_geom_type = ""
-            fieldnames = []
-            props = [attr for attr in f.attributes()]
-
-        id_data: str = layer_id + layer_geom_type + str(fieldnames) + str(props) + geoms
-        return hashlib.md5(id_data.encode("utf-8")).hexdigest()
+            pass
+        attributes = "\x1f".join([str(attr) for attr in f.attributes()])
+        id_hash.update(("\x1e" + attributes).encode("utf-8"))
+        return id_hash.hexdigest()
 
     except Exception as e:
         logToUser(
@@ -95,15 +141,82 @@ def generate_qgis_app_id(
         return ""
 
 
+def getRasterAppIdCache() -> Dict[str, str]:
+    """Get raster application IDs saved on disk (loaded once per session)."""
+    global _raster_app_id_cache
+    if _raster_app_id_cache is None:
+        _raster_app_id_cache = {}
+        try:
+            path = os.path.join(user_speckle_folder_path(), RASTER_APP_ID_CACHE_FILE)
+            if os.path.isfile(path):
+                with open(path, "r") as file:
+                    _raster_app_id_cache = json.load(file)
+        except Exception as e:
+            logToUser(e, level=2, func=inspect.stack()[0][3])
+    return _raster_app_id_cache
+
+
+def saveRasterAppIdCache(key: str, app_id: str):
+    """Save raster application ID to the cache on disk, dropping the oldest records."""
+    cache = getRasterAppIdCache()
+    cache.pop(key, None)
+    cache[key] = app_id
+    extra_records = max(0, len(cache) - RASTER_APP_ID_CACHE_SIZE)
+    for old_key in list(cache.keys())[:extra_records]:
+        cache.pop(old_key)
+    try:
+        path = os.path.join(user_speckle_folder_path(), RASTER_APP_ID_CACHE_FILE)
+        with open(path, "w") as file:
+            json.dump(cache, file)
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3])
+
+
+def iterRasterBandBlocks(band):
+    """Read the raster band in strips of whole GDAL blocks rows, about RASTER_VALUES_CHUNK_BYTES each."""
+    block_rows = max(1, band.GetBlockSize()[1])
+    row_bytes = max(1, band.XSize * gdal.GetDataTypeSize(band.DataType) // 8)
+    rows = max(1, int(RASTER_VALUES_CHUNK_BYTES / row_bytes / block_rows)) * block_rows
+    for row_offset in range(0, band.YSize, rows):
+        yield band.ReadAsArray(
+            0, row_offset, band.XSize, min(rows, band.YSize - row_offset)
+        )
+
+
 def generate_qgis_raster_app_id(rasterLayer):
     """Generate unique ID for Raster layer."""
     try:
-        id_data = str(get_raster_stats(rasterLayer))
-        file_ds = gdal.Open(rasterLayer.source(), gdal.GA_ReadOnly)
+        source = rasterLayer.source()
+        file_ds = gdal.Open(source, gdal.GA_ReadOnly)
+        id_metadata = str(file_ds.GetGeoTransform()) + file_ds.GetProjection()
+
+        # reuse the ID, if the file didn't change since the last send
+        cache_key = None
+        if os.path.isfile(source):
+            file_stats = os.stat(source)
+            cache_key = "|".join(
+                [
+                    os.path.abspath(source),
+                    str(file_stats.st_size),
+                    str(file_stats.st_mtime_ns),
+                    id_metadata,
+                ]
+            )
+            cache_key = hashlib.md5(cache_key.encode("utf-8")).hexdigest()
+            app_id = getRasterAppIdCache().get(cache_key)
+            if app_id is not None:
+                return app_id
+
+        id_hash = hashlib.md5(id_metadata.encode("utf-8"))
         for i in range(rasterLayer.bandCount()):
             band = file_ds.GetRasterBand(i + 1)
-            id_data += str(band.ReadAsArray())
-        return hashlib.md5(id_data.encode("utf-8")).hexdigest()
+            for block in iterRasterBandBlocks(band):
+                id_hash.update(block.tobytes())
+        app_id = id_hash.hexdigest()
+
+        if cache_key is not None:
+            saveRasterAppIdCache(cache_key, app_id)
+        return app_id
 
     except Exception as e:
         logToUser(
@@ -475,6 +588,57 @@ def validateAttributeName(name: str, fieldnames: List[str]) -> str:
         return
 
 
+def isNullAttributeValue(value) -> bool:
+    """Check if the attribute value is None or NULL QVariant."""
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+def convertAttributeValue(value):
+    """Get the sent attribute value: None for NULL, lists joined into a string."""
+    if isNullAttributeValue(value):
+        return None
+    if isinstance(value, list):
+        return ", ".join([str(x) for x in value])
+    return value
+
+
+def convertTextAttributeValue(value):
+    """Get the sent value of a text attribute, "NULL" text as None."""
+    if value == "NULL":
+        return None
+    return convertAttributeValue(value)
+
+
+def convertDateAttributeValue(value):
+    """Get the sent value of a date or time attribute, as text parsed on receive."""
+    if isNullAttributeValue(value):
+        return None
+    return str(value)
+
+
+def getAttributesPlan(fields: "QgsFields") -> List[Tuple[int, str, Any]]:
+    """Get (field index, Speckle attribute name, value converter) for each layer field, computed once per layer."""
+    try:
+        fieldnames = [str(field.name()) for field in fields]
+        converters = {
+            QVariant.String: convertTextAttributeValue,
+            QVariant.Date: convertDateAttributeValue,
+            QVariant.Time: convertDateAttributeValue,
+            QVariant.DateTime: convertDateAttributeValue,
+        }
+        return [
+            (
+                index,
+                validateAttributeName(name, fieldnames),
+                converters.get(field.type(), convertAttributeValue),
+            )
+            for index, (name, field) in enumerate(zip(fieldnames, fields))
+        ]
+    except Exception as e:
+        logToUser(e, level=2, func=inspect.stack()[0][3])
+        return []
+
+
 def trySaveCRS(crs, streamBranch: str = ""):
     try:
         authid = crs.authid()
@@ -546,51 +710,173 @@ def getArrayIndicesFromXY(settings, x, y):
         return ind1, ind2, remainder1, remainder2
 
 
+def getClosestIndicesInRange(indices: np.ndarray, size: int) -> np.ndarray:
+    """Vectorized getClosestIndex, with the same +-1 deviation as getArrayIndicesFromXY; -1 where out of range."""
+    closest = np.trunc(indices)
+    outside = ~((closest >= 0) & (closest < size))
+    closest[outside] = np.trunc(indices[outside] - 1)  # try deviating +- 1
+    outside &= ~((closest >= 0) & (closest < size))
+    closest[outside] = np.trunc(indices[outside] + 1)
+
+    inside = (closest >= 0) & (closest < size)
+    result = np.full(closest.shape, -1, dtype=np.int64)
+    result[inside] = closest[inside]
+    return result
+
+
+def getArrayIndicesFromXYArrays(
+    settings, x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get cell x&y indices on a given layer for arrays of absolute XY coordinates, -1 for points outside the layer."""
+    resX, resY, minX, minY, sizeX, sizeY, wkt, proj = settings
+    x, y = np.broadcast_arrays(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
+    ind2 = getClosestIndicesInRange((x - minX) / resX, sizeX)
+    ind1 = getClosestIndicesInRange((y - minY) / resY, sizeY)
+
+    outside = (ind1 < 0) | (ind2 < 0)
+    ind1[outside] = -1
+    ind2[outside] = -1
+    return ind1, ind2
+
+
 def getXYofArrayPoint(rasterResXY, minX, minY, indexX, indexY):
     x = minX + rasterResXY[0] * indexX
     y = minY + rasterResXY[1] * indexY
     return x, y
 
 
+def parseSavedTransform(item: str) -> Dict[str, Any]:
+    """Split the saved transform record "layer ('attribute')  ->  Transform name" into its parts."""
+    layer_name = item.split("  ->  ")[0].split(" ('")[0]
+    transform_name = item.split("  ->  ")[1]
+    attribute = None
+    if " ('" in item:
+        attribute = item.split(" ('")[1].split("') ")[0]
+    return {
+        "layer_name": layer_name,
+        "name": transform_name,
+        "kind": transform_name.lower(),
+        "attribute": attribute,
+        "options": getRasterTransformOptions(attribute),
+        "ignore": "ignore" in transform_name.lower(),
+    }
+
+
+def updateSavedTransformsIndex(dataStorage) -> Dict[str, List[Dict[str, Any]]]:
+    """Parse the saved transforms into records grouped by layer name (in the saved order), to call when the list changes."""
+    index = {}
+    savedTransforms = dataStorage.savedTransforms
+    for item in savedTransforms or []:
+        try:
+            record = parseSavedTransform(item)
+        except IndexError:  # not a valid record
+            continue
+        index.setdefault(record["layer_name"], []).append(record)
+    dataStorage.savedTransformsIndex = (
+        savedTransforms,
+        len(savedTransforms or []),
+        index,
+    )
+    return index
+
+
+def getLayerTransforms(layer, dataStorage) -> List[Dict[str, Any]]:
+    """Get the parsed saved transforms of the layer."""
+    saved = getattr(dataStorage, "savedTransformsIndex", None)
+    # re-parse if the list was replaced or changed without updating the index
+    if (
+        saved is None
+        or saved[0] is not dataStorage.savedTransforms
+        or saved[1] != len(dataStorage.savedTransforms or [])
+    ):
+        index = updateSavedTransformsIndex(dataStorage)
+    else:
+        index = saved[2]
+    return index.get(layer.name(), [])
+
+
 def isAppliedLayerTransformByKeywords(
     layer, keywordsYes: List[str], keywordsNo: List[str], dataStorage
 ):
     correctTransform = False
-    if dataStorage.savedTransforms is not None:
-        all_saved_transforms = [
-            item.split("  ->  ")[1] for item in dataStorage.savedTransforms
-        ]
-        all_saved_transform_layers = [
-            item.split("  ->  ")[0].split(" ('")[0]
-            for item in dataStorage.savedTransforms
-        ]
+    if len(keywordsYes) == 0 and len(keywordsNo) == 0:
+        return correctTransform
+
+    layer_transforms = getLayerTransforms(layer, dataStorage)
+    if len(layer_transforms) > 0:
+        # the last transform recorded for the layer applies
+        transform_name_recorded = layer_transforms[-1]["kind"]
+        correctTransform = all(
+            word in transform_name_recorded for word in keywordsYes
+        ) and all(word not in transform_name_recorded for word in keywordsNo)
+    return correctTransform
 
-        for item in dataStorage.savedTransforms:
-            layer_name_recorded = item.split("  ->  ")[0].split(" ('")[0]
-            transform_name_recorded = item.split("  ->  ")[1]
 
-            if layer_name_recorded == layer.name():
-                if len(keywordsYes) > 0 or len(keywordsNo) > 0:
-                    correctTransform = True
-                for word in keywordsYes:
-                    if word in transform_name_recorded.lower():
-                        pass
-                    else:
-                        correctTransform = False
-                        break
-                for word in keywordsNo:
-                    if word not in transform_name_recorded.lower():
-                        pass
-                    else:
-                        correctTransform = False
-                        break
-
-            # if correctTransform is True and layer_name_recorded == layer.name():
-            #    # find a layer for meshing, if mesh transformation exists
-            #    for l in dataStorage.all_layers:
-            #        if layer_name_recorded == l.name():
-            #            return l
-    return correctTransform
+def getRasterOptionKind(option: str) -> Union[str, None]:
+    """Get the kind of the raster transform option: "lod", "values", "simplify", "vertices", "nodata" or "compact"."""
+    if option in RASTER_LOD_OPTIONS:
+        return "lod"
+    if option == RASTER_LOD_FULL_VALUES:
+        return "values"
+    if option in RASTER_SIMPLIFY_OPTIONS:
+        return "simplify"
+    if option == RASTER_SEPARATE_VERTICES:
+        return "vertices"
+    if option == RASTER_KEEP_NODATA:
+        return "nodata"
+    if option == RASTER_COMPACT_VALUES:
+        return "compact"
+    return None
+
+
+def getRasterTransformOptions(attribute: Union[str, None]) -> Dict[str, str]:
+    """Split the raster transform options saved in the attribute slot of the record by their kind."""
+    options = {}
+    for option in (attribute or "").split(RASTER_OPTIONS_SEPARATOR):
+        kind = getRasterOptionKind(option)
+        if kind is not None:
+            options[kind] = option
+    return options
+
+
+def addRasterTransformOption(attribute: Union[str, None], option: str) -> str:
+    """Add the option to the saved raster transform options, replacing the option of the same kind."""
+    options = getRasterTransformOptions(attribute)
+    options[getRasterOptionKind(option)] = option
+    return RASTER_OPTIONS_SEPARATOR.join(
+        options[kind]
+        for kind in ["lod", "values", "compact", "simplify", "vertices", "nodata"]
+        if kind in options
+    )
+
+
+def getRasterLodFromOptions(options: Dict[str, str]) -> Tuple[Union[int, None], bool]:
+    """Get max number of mesh cells and whether to send full resolution values from the raster transform options."""
+    max_cells = RASTER_LOD_OPTIONS.get(options.get("lod"))
+    return max_cells, "values" in options and max_cells is not None
+
+
+def getRasterLayerTransformOptions(layer, dataStorage) -> Dict[str, str]:
+    """Get the options saved with the raster layer transform."""
+    layer_transforms = getLayerTransforms(layer, dataStorage)
+    if len(layer_transforms) > 0:
+        # the last transform recorded for the layer applies
+        return layer_transforms[-1]["options"]
+    return {}
+
+
+def getRasterLayerLod(layer, dataStorage) -> Tuple[Union[int, None], bool]:
+    """Get level-of-detail settings saved with the raster layer transform."""
+    return getRasterLodFromOptions(getRasterLayerTransformOptions(layer, dataStorage))
+
+
+def getRasterLayerSimplifyTolerance(layer, dataStorage) -> Union[float, None]:
+    """Get terrain simplification tolerance saved with the raster layer transform."""
+    return RASTER_SIMPLIFY_OPTIONS.get(
+        getRasterLayerTransformOptions(layer, dataStorage).get("simplify")
+    )
 
 
 def getElevationLayer(dataStorage):
@@ -605,28 +891,70 @@ def getElevationLayer(dataStorage):
         return None
 
 
+def getRasterSourceKey(rasterLayer) -> Tuple:
+    """Get a key identifying the current state of the raster layer source."""
+    source = rasterLayer.source()
+    if os.path.isfile(source):
+        file_stats = os.stat(source)
+        return (source, file_stats.st_size, file_stats.st_mtime_ns)
+    return (source, None, None)
+
+
 def get_raster_stats(rasterLayer):
+    """Get resolution, origin, size and CRS of the raster, without reading the band values."""
     try:
+        source_key = getRasterSourceKey(rasterLayer)
+        if source_key in _raster_stats_cache:
+            return _raster_stats_cache[source_key]
+
         file_ds = gdal.Open(rasterLayer.source(), gdal.GA_ReadOnly)
         xres, yres = (
             float(file_ds.GetGeoTransform()[1]),
             float(file_ds.GetGeoTransform()[5]),
         )
         originX, originY = (file_ds.GetGeoTransform()[0], file_ds.GetGeoTransform()[3])
-        band = file_ds.GetRasterBand(1)
         rasterWkt = file_ds.GetProjection()
         rasterProj = (
             QgsCoordinateReferenceSystem.fromWkt(rasterWkt)
             .toProj()
             .replace(" +type=crs", "")
         )
-        sizeX, sizeY = (band.ReadAsArray().shape[1], band.ReadAsArray().shape[0])
-
-        return xres, yres, originX, originY, sizeX, sizeY, rasterWkt, rasterProj
+        sizeX, sizeY = (file_ds.RasterXSize, file_ds.RasterYSize)
+
+        stats = (xres, yres, originX, originY, sizeX, sizeY, rasterWkt, rasterProj)
+        # forget the previous states of the same source
+        for key in [k for k in _raster_stats_cache if k[0] == source_key[0]]:
+            _raster_stats_cache.pop(key)
+        _raster_stats_cache[source_key] = stats
+        return stats
     except Exception as e:
         return None, None, None, None, None, None, None, None
 
 
+def encodeRasterBandValues(values: np.ndarray, columns: int) -> List[str]:
+    """Encode raster band values (in their native type) into zlib-compressed base64 chunks of whole rows."""
+    values = np.ascontiguousarray(values).reshape(-1)
+    row_bytes = max(1, columns * values.itemsize)
+    chunk_size = max(1, int(RASTER_VALUES_CHUNK_BYTES / row_bytes)) * columns
+    return [
+        base64.b64encode(zlib.compress(values[i : i + chunk_size].tobytes())).decode(
+            "ascii"
+        )
+        for i in range(0, len(values), chunk_size)
+    ]
+
+
+def decodeRasterBandValues(chunks: List[str], dtype: str) -> np.ndarray:
+    """Decode raster band values from the chunks created by encodeRasterBandValues."""
+    arrays = [
+        np.frombuffer(zlib.decompress(base64.b64decode(chunk)), dtype=dtype)
+        for chunk in chunks
+    ]
+    if len(arrays) == 0:
+        return np.array([], dtype=dtype)
+    return np.concatenate(arrays)
+
+
 def getRasterArrays(elevationLayer):
     const = float(-1 * math.pow(10, 30))
 
@@ -1,7 +1,21 @@
 import inspect
 import os
 from speckle.converter.layers import getAllLayers
-from speckle.converter.layers.utils import getElevationLayer, getLayerGeomType
+from speckle.converter.layers.utils import (
+    RASTER_COMPACT_VALUES,
+    RASTER_KEEP_NODATA,
+    RASTER_LOD_FULL_VALUES,
+    RASTER_LOD_OPTIONS,
+    RASTER_OPTIONS_TRANSFORM,
+    RASTER_SEPARATE_VERTICES,
+    RASTER_SIMPLIFY_OPTIONS,
+    addRasterTransformOption,
+    getElevationLayer,
+    getLayerGeomType,
+    getRasterOptionKind,
+    parseSavedTransform,
+    updateSavedTransformsIndex,
+)
 from specklepy_qt_ui.qt_ui.widget_transforms import MappingSendDialog
 from specklepy_qt_ui.qt_ui.utils.logger import displayUserMsg
 
@@ -42,11 +56,17 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
         self.populateSavedTransforms(self.dataStorage)
         self.populateSavedElevationLayer(self.dataStorage)
 
+    def addRasterOptionsTransform(self):
+        """Add the transform with raster options for any raster layer (e.g. the level of detail) to the catalog."""
+        if RASTER_OPTIONS_TRANSFORM not in self.dataStorage.transformsCatalog:
+            self.dataStorage.transformsCatalog.append(RASTER_OPTIONS_TRANSFORM)
+
     def populateSavedTransforms(
         self, dataStorage
     ):  # , savedTransforms: Union[List, None] = None, getLayer: Union[str, None] = None, getTransform: Union[str, None] = None):
         if dataStorage is not None:
             self.dataStorage = dataStorage  # making sure lists are synced
+        self.addRasterOptionsTransform()
         self.transformationsList.clear()
         vals = self.dataStorage.savedTransforms
         all_l_names = [l.name() for l in self.dataStorage.all_layers]
@@ -85,6 +105,8 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
 
                     self.transformationsList.addItem(listItem)
 
+        updateSavedTransformsIndex(self.dataStorage)
+
     def onAddTransform(self):
         from speckle.utils.project_vars import set_transformations
 
@@ -104,9 +126,29 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
             transform_name = listItem.split("  ->  ")[1].lower()
 
             exists = 0
-            for record in self.dataStorage.savedTransforms:
+            option = str(self.attrDropdown.currentText())
+            for i, record in enumerate(self.dataStorage.savedTransforms):
                 current_layer_name = record.split("  ->  ")[0].split(" ('")[0]
                 current_transf_name = record.split("  ->  ")[1].lower()
+                if (
+                    layer_name == current_layer_name
+                    and current_transf_name == transform_name
+                    and getRasterOptionKind(option) is not None
+                ):
+                    # add the raster option to the existing transform
+                    exists += 1
+                    self.dataStorage.savedTransforms[i] = (
+                        layer_name
+                        + " ('"
+                        + addRasterTransformOption(
+                            parseSavedTransform(record)["attribute"], option
+                        )
+                        + "')  ->  "
+                        + record.split("  ->  ")[1]
+                    )
+                    self.populateSavedTransforms(self.dataStorage)
+                    set_transformations(self.dataStorage)
+                    break
                 if layer_name == current_layer_name:  # in layers
                     exists += 1
                     displayUserMsg(
@@ -122,8 +164,14 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
                 if layer is not None:
                     if (
                         "attribute" in transform_name
-                        and self.attrDropdown.currentText() != ""
-                    ):
+                        or (
+                            (
+                                "elevation" in transform_name
+                                or transform_name == RASTER_OPTIONS_TRANSFORM.lower()
+                            )
+                            and isinstance(layer, QgsRasterLayer)
+                        )
+                    ) and self.attrDropdown.currentText() != "":
                         listItem = (
                             str(self.layerDropdown.currentText())
                             + " ('"
@@ -218,6 +266,13 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
                         if "polygon" in geom_type.lower():
                             listItem = layer.name()
 
+                elif transform == RASTER_OPTIONS_TRANSFORM:
+                    if isinstance(layer, QgsRasterLayer):
+                        # avoiding tiling layers
+                        ds = gdal.Open(layer.source(), gdal.GA_ReadOnly)
+                        if ds is not None:
+                            listItem = layer.name()
+
                 elif "elevation" in transform.lower():
                     if isinstance(layer, QgsRasterLayer):
                         # avoiding tiling layers
@@ -257,6 +312,25 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
             layerForAttributes = None
             for i, layer in enumerate(self.dataStorage.all_layers):
                 if layer_name == layer.name():
+                    if isinstance(layer, QgsRasterLayer) and (
+                        "elevation" in transform_name.lower()
+                        or transform_name == RASTER_OPTIONS_TRANSFORM
+                    ):
+                        # level of detail for the raster mesh
+                        self.attr_label.setEnabled(True)
+                        self.attrDropdown.setEnabled(True)
+                        # each option is saved as a separate field of the transform,
+                        # adding another option to the same transform combines them
+                        for option in RASTER_LOD_OPTIONS:
+                            self.attrDropdown.addItem(option)
+                        self.attrDropdown.addItem(RASTER_LOD_FULL_VALUES)
+                        self.attrDropdown.addItem(RASTER_COMPACT_VALUES)
+                        self.attrDropdown.addItem(RASTER_SEPARATE_VERTICES)
+                        self.attrDropdown.addItem(RASTER_KEEP_NODATA)
+                        if "mesh" in transform_name.lower():
+                            for option in RASTER_SIMPLIFY_OPTIONS:
+                                self.attrDropdown.addItem(option)
+                        return
                     if isinstance(layer, QgsVectorLayer):
                         geom_type = getLayerGeomType(layer)
                         if "polygon" in geom_type.lower():
@@ -285,6 +359,7 @@ class MappingSendDialogQGIS(MappingSendDialog, FORM_CLASS):
     def populateTransforms(self):
         try:
             self.transformDropdown.clear()
+            self.addRasterOptionsTransform()
             for item in self.dataStorage.transformsCatalog:
                 self.transformDropdown.addItem(item)
         except Exception as e:
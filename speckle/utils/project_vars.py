@@ -1,7 +1,11 @@
 # Persist added streams in project
 import inspect
 from typing import List
-from speckle.converter.layers.utils import getElevationLayer, trySaveCRS
+from speckle.converter.layers.utils import (
+    getElevationLayer,
+    trySaveCRS,
+    updateSavedTransformsIndex,
+)
 
 try:
     from speckle_qgis import SpeckleQGIS
@@ -219,6 +223,7 @@ def get_transformations(dataStorage):
         if record[1] and len(record[0]) > 0:
             vals: List[str] = record[0].split(";")
             dataStorage.savedTransforms.extend(vals)
+        updateSavedTransformsIndex(dataStorage)
 
     except Exception as e:
         logToUser(e, level=2, func=inspect.stack()[0][3])
@@ -232,6 +237,7 @@ def set_transformations(dataStorage):
         vals = dataStorage.savedTransforms
         transforms = ";".join(vals)
         proj.writeEntry("speckle-qgis", "transformations", transforms)
+        updateSavedTransformsIndex(dataStorage)
         return True
 
     except Exception as e:
@@ -73,6 +73,8 @@ from speckle.converter.layers.layer_conversions import (
     convertSelectedLayersToSpeckle,
 )
 from speckle.converter.layers import findAndClearLayerGroup
+from speckle.converter.geometry.transform import clearTransformCache
+from speckle.converter.layers.symbology import clearLayerColorResolvers
 
 from specklepy_qt_ui.qt_ui.DataStorage import DataStorage
 
@@ -526,6 +528,8 @@ class SpeckleQGIS:
 
             self.dataStorage.latestActionReport = []
             self.dataStorage.latestActionFeaturesReport = []
+            clearTransformCache()
+            clearLayerColorResolvers()
             base_obj = Collection(
                 units=units,
                 collectionType="QGIS commit",
@@ -982,6 +986,7 @@ class SpeckleQGIS:
 
             self.dataStorage.latestActionLayers = []
             self.dataStorage.latestActionReport = []
+            clearTransformCache()
 
             # conversions
             time_start_conversion = self.dataStorage.latestConversionTime = (
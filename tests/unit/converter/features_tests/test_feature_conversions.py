@@ -1,3 +1,5 @@
+import numpy as np
+
 from speckle.converter.features.feature_conversions import (
     featureToSpeckle,
     rasterFeatureToSpeckle,
@@ -5,4 +7,103 @@ from speckle.converter.features.feature_conversions import (
     bimFeatureToNative,
     nonGeomFeatureToNative,
     cadFeatureToNative,
+    get_raster_mesh_faces,
+    get_raster_class_colors,
+    pack_raster_colors,
+    get_raster_color_repeat_ratio,
+    get_raster_shared_grid_mesh,
+    get_raster_simplified_mesh,
+    get_raster_band_stats,
+    get_raster_nodata_mask,
+    normalize_raster_band,
 )
+
+
+def test_get_raster_mesh_faces():
+    result = get_raster_mesh_faces(2)
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == [4, 0, 1, 2, 3, 4, 4, 5, 6, 7]
+
+
+def test_pack_raster_colors():
+    channel = np.array([0, 255], dtype=np.uint32)
+    mask = np.array([False, True])
+    result = pack_raster_colors(channel, channel, channel, mask)
+    assert result.tolist() == [255 << 24, 0]
+
+
+def test_get_raster_class_colors():
+    band_values = np.array([0.0, 1.0, 1.5, 2.0, 7.0, -1.0])
+    mask = band_values == -1.0
+    class_values = [2.0, 1.0]  # unsorted, as read from the renderer
+    class_rgbs = [(0, 0, 255), (255, 0, 0)]
+    result = get_raster_class_colors(band_values, class_values, class_rgbs, mask)
+    red = (255 << 24) + (255 << 16)
+    blue = (255 << 24) + 255
+    assert result.tolist() == [0, red, red, blue, blue, 0]
+
+
+def test_get_raster_shared_grid_mesh():
+    # 2x1 raster: the middle edge is shared if the pixel colors match
+    vertices = np.array(
+        [0, 0, 0, 0, -1, 0, 1, -1, 0, 1, 0, 0, 1, 0, 0, 1, -1, 0, 2, -1, 0, 2, 0, 0],
+        dtype=np.float64,
+    )
+    colors = np.full(8, 5, dtype=np.uint32)
+    new_vertices, faces, new_colors = get_raster_shared_grid_mesh(vertices, colors, 2)
+    assert len(new_vertices) == 3 * 6
+    assert len(new_colors) == 6
+    assert faces.tolist() == [4, 0, 3, 4, 1, 4, 1, 4, 5, 2]
+
+    colors[4:] = 6
+    new_vertices, faces, new_colors = get_raster_shared_grid_mesh(vertices, colors, 2)
+    assert len(new_vertices) == 3 * 8
+
+    # only the second pixel is meshed
+    new_vertices, faces, new_colors = get_raster_shared_grid_mesh(
+        vertices[12:], colors[4:], 2, np.array([1])
+    )
+    assert new_vertices.tolist() == [1, 0, 0, 2, 0, 0, 1, -1, 0, 2, -1, 0]
+    assert faces.tolist() == [4, 0, 2, 3, 1]
+
+
+def test_get_raster_color_repeat_ratio():
+    assert get_raster_color_repeat_ratio(np.array([5, 5, 5, 6, 6])) == 0.75
+    assert get_raster_color_repeat_ratio(np.arange(10, dtype=np.uint32)) == 0.0
+    assert get_raster_color_repeat_ratio(np.array([5], dtype=np.uint32)) == 0.0
+
+
+def test_get_raster_simplified_mesh():
+    # flat 4x4 raster is merged into 1 block
+    grid_x = np.arange(5, dtype=np.float64)
+    grid_y = -np.arange(5, dtype=np.float64)
+    grid_z = np.zeros((5, 5))
+    colors = np.full((4, 4), 5, dtype=np.uint32)
+    vertices, faces, new_colors = get_raster_simplified_mesh(
+        grid_x, grid_y, grid_z, colors, 0.1
+    )
+    assert len(vertices) == 3 * 4
+    assert faces.tolist() == [4, 0, 2, 3, 1]
+    assert new_colors.tolist() == [5, 5, 5, 5]
+
+    # a peak in the middle keeps the full resolution around it
+    grid_z[2, 2] = 1
+    vertices, faces, new_colors = get_raster_simplified_mesh(
+        grid_x, grid_y, grid_z, colors, 0.1
+    )
+    assert len(vertices) == 3 * 25
+
+
+def test_get_raster_band_stats_all_nodata():
+    class NoDataBand:
+        def GetNoDataValue(self):
+            return -9999.0
+
+    values = np.array([[-9999.0, np.nan], [np.nan, -9999.0]])
+    valMin, valMax, extremeMin = get_raster_band_stats(NoDataBand(), values)
+    assert (valMin, valMax, extremeMin) == (0.0, 0.0, None)
+
+    channel = normalize_raster_band(values.reshape(-1), valMin, valMax)
+    mask = get_raster_nodata_mask(values.reshape(-1), -9999.0)
+    colors = pack_raster_colors(channel, channel, channel, mask)
+    assert colors.tolist() == [0, 0, 0, 0]
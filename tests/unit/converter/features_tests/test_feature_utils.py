@@ -1,5 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+
 from speckle.converter.features.utils import (
     addFeatVariant,
     updateFeat,
     getPolygonFeatureHeight,
+    getLayerExistingHeights,
 )
+
+
+def test_getLayerExistingHeights():
+    qgis_core = pytest.importorskip("qgis.core")
+    layer = qgis_core.QgsVectorLayer(
+        "Polygon?crs=EPSG:32633&field=name:string&field=height:double",
+        "buildings",
+        "memory",
+    )
+    features = []
+    for i, height in enumerate([12.0, None, 3.5, 40.0, None, 7.0, 21.0]):
+        f = qgis_core.QgsFeature(layer.fields())
+        f.setGeometry(
+            qgis_core.QgsGeometry.fromWkt(
+                f"POLYGON(({i} 0, {i + 1} 0, {i + 1} 1, {i} 1, {i} 0))"
+            )
+        )
+        f.setAttributes([f"building {i}", height])
+        features.append(f)
+    layer.dataProvider().addFeatures(features)
+
+    # values read with the full features, as before
+    all_existing_vals = [
+        f["height"]
+        for f in layer.getFeatures()
+        if f["height"] is not None
+        and (isinstance(f["height"], float) or isinstance(f["height"], int))
+    ]
+    expected = (
+        len(all_existing_vals),
+        all_existing_vals[int(len(all_existing_vals) / 2)],
+    )
+
+    dataStorage = SimpleNamespace(layerExistingHeights=None)
+    assert getLayerExistingHeights(layer, "height", dataStorage) == expected
+    assert dataStorage.layerExistingHeights == ((layer.id(), "height"), expected)
+    # read once per layer
+    layer.dataProvider().truncate()
+    assert getLayerExistingHeights(layer, "height", dataStorage) == expected
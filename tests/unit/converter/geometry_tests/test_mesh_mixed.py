@@ -11,6 +11,8 @@ from speckle.converter.geometry.mesh import (
 from typing import Tuple
 import pathlib
 
+import numpy as np
+
 import shapefile
 from specklepy.objects.geometry import Mesh
 
@@ -68,3 +70,13 @@ def test_constructMesh(data_storage):
     assert len(result.vertices) == len(vertices)
     assert hasattr(result, "renderMaterial")
     assert result["renderMaterial"]["diffuse"] == colors[0]
+
+
+def test_constructMeshFromRaster_arrays(data_storage):
+    vertices = np.array([0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0], dtype=np.float64)
+    faces = np.array([4, 0, 1, 2, 3])
+    colors = np.array([0, 0, 0, 0], dtype=np.uint32)
+    result = constructMeshFromRaster(vertices, faces, colors, data_storage)
+    assert isinstance(result, Mesh)
+    assert isinstance(result.vertices, list)
+    assert result.faces == [4, 0, 1, 2, 3]
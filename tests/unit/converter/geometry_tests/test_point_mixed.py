@@ -3,7 +3,9 @@ from speckle.converter.geometry.point import (
     pointToSpeckle,
     pointToNative,
     pointToNativeWithoutTransforms,
+    geometryToSpeckleArray,
 )
+import shapely
 from specklepy.objects.geometry import Point
 
 
@@ -12,3 +14,12 @@ def test_scalePointToNative(data_storage):
     pt.units = "m"
     result = scalePointToNative(pt, pt.units, data_storage)
     assert isinstance(result, Point)
+
+
+def test_geometryToSpeckleArray(data_storage):
+    class WkbGeometry:
+        def asWkb(self):
+            return shapely.to_wkb(shapely.LineString([(0, 1), (2, 3), (4, 5)]))
+
+    result = geometryToSpeckleArray(WkbGeometry(), data_storage)
+    assert result.tolist() == [[0, 1, 0], [2, 3, 0], [4, 5, 0]]
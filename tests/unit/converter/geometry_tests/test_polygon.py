@@ -1,3 +1,7 @@
+import math
+
+import numpy as np
+
 from speckle.converter.geometry.polygon import (
     polygonToSpeckleMesh,
     getZaxisTranslation,
@@ -5,4 +9,33 @@ from speckle.converter.geometry.polygon import (
     polygonToSpeckle,
     polygonToNative,
     getPolyBoundaryVoids,
+    getPartsZaxisTranslations,
 )
+
+
+def per_part_translation(heights, z):
+    # per-feature loop used before the layer was sampled at once
+    allElevations = [h for h in heights if not math.isnan(h)]
+    if len(allElevations) == 0:
+        return None
+    if math.isnan(z):
+        return min(allElevations)
+    return min(allElevations) - z
+
+
+def test_getPartsZaxisTranslations():
+    parts = [
+        [5.0, 3.0, 4.0],  # flat polygon
+        [np.nan, 7.0, 2.5, np.nan],  # partly outside of the elevation layer
+        [np.nan, np.nan],  # no sampled points
+        [10.0],  # 3d polygon
+        [1.0, np.nan, 0.5],
+    ]
+    first_z = [np.nan, np.nan, np.nan, 4.0, 2.0]
+    part_starts = np.cumsum([0] + [len(p) for p in parts[:-1]]).tolist()
+    heights = np.array([h for part in parts for h in part])
+
+    result = getPartsZaxisTranslations(heights, part_starts, first_z)
+    expected = [per_part_translation(p, z) for p, z in zip(parts, first_z)]
+    assert result == expected
+    assert result[2] is None
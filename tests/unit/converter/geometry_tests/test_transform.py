@@ -1 +1,36 @@
-from speckle.converter.geometry.transform import transform
+import pytest
+
+from speckle.converter.geometry.transform import (
+    transform,
+    clearTransformCache,
+    getCoordinateTransform,
+    getLayerTransformToProject,
+)
+
+
+def test_getCoordinateTransform_cache():
+    qgis_core = pytest.importorskip("qgis.core")
+    project = qgis_core.QgsProject.instance()
+    wgs84 = qgis_core.QgsCoordinateReferenceSystem("EPSG:4326")
+    utm = qgis_core.QgsCoordinateReferenceSystem("EPSG:32633")
+    clearTransformCache()
+
+    xform = getCoordinateTransform(wgs84, utm, project)
+    assert getCoordinateTransform(wgs84, utm, project) is xform
+    # another CRS pair
+    other = getCoordinateTransform(
+        wgs84, qgis_core.QgsCoordinateReferenceSystem("EPSG:3857"), project
+    )
+    assert other is not xform
+    assert other.destinationCrs().authid() == "EPSG:3857"
+
+    # same CRS: no transform for the layer
+    layer = qgis_core.QgsVectorLayer("Point?crs=EPSG:4326", "points", "memory")
+    project.setCrs(wgs84)
+    assert getLayerTransformToProject(layer, project) is None
+    project.setCrs(utm)
+    assert getLayerTransformToProject(layer, project) is xform
+
+    # new transforms after the cache is cleared
+    clearTransformCache()
+    assert getCoordinateTransform(wgs84, utm, project) is not xform
@@ -24,6 +24,7 @@ from speckle.converter.geometry.utils import (
     getArcRadianAngle,
     getArcAngles,
     getArcNormal,
+    apply_offsets_rotation_on_send_array,
     apply_pt_offsets_rotation_on_send,
     transform_speckle_pt_on_receive,
     apply_pt_transform_matrix,
@@ -309,6 +310,18 @@ def test_apply_pt_offsets_rotation_on_send_rotate(data_storage):
     assert (result[0] - x) < 0.0000001 and (result[1] + y) < 0.0000001
 
 
+def test_apply_offsets_rotation_on_send_array(data_storage):
+    data_storage.crs_offset_x = 5.0
+    data_storage.crs_rotation = 30
+    coords = np.array([[0.0, 10.0, 1.0], [5.0, -2.0, 2.0]])
+    expected = [
+        apply_pt_offsets_rotation_on_send(x, y, data_storage) for x, y, _ in coords
+    ]
+    result = apply_offsets_rotation_on_send_array(coords, data_storage)
+    assert np.allclose(result[:, :2], expected)
+    assert result[:, 2].tolist() == [1.0, 2.0]
+
+
 def test_transform_speckle_pt_on_receive_rotate(data_storage):
     pt = Point.from_list([0, 4, 0])
     data_storage.crs_rotation = 180
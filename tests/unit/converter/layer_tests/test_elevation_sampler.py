@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from speckle.converter.layers.ElevationSampler import (
+    ElevationSampler,
+    clearElevationSampler,
+    getElevationSampler,
+)
+
+
+class RasterLayer:
+    def __init__(self, layer_id, source):
+        self.layer_id = layer_id
+        self.path = source
+
+    def id(self):
+        return self.layer_id
+
+    def source(self):
+        return self.path
+
+
+def write_elevation_raster(path, size_x, size_y, block_size=16):
+    """Write a tiled raster with a different height in every pixel, return the heights."""
+    gdal = pytest.importorskip("osgeo.gdal")
+    heights = np.arange(size_x * size_y, dtype=np.float32).reshape(size_y, size_x)
+    ds = gdal.GetDriverByName("GTiff").Create(
+        str(path),
+        size_x,
+        size_y,
+        1,
+        gdal.GDT_Float32,
+        options=[
+            "TILED=YES",
+            f"BLOCKXSIZE={block_size}",
+            f"BLOCKYSIZE={block_size}",
+        ],
+    )
+    ds.SetGeoTransform([0, 1, 0, size_y, 0, -1])
+    ds.GetRasterBand(1).WriteArray(heights)
+    ds = None
+    return heights
+
+
+def test_sampleIndices_across_blocks(tmp_path):
+    gdal = pytest.importorskip("osgeo.gdal")
+    path = tmp_path / "dem.tif"
+    write_elevation_raster(path, 50, 40)
+    sampler = ElevationSampler(RasterLayer("dem", str(path)))
+    assert sampler.blocks_per_row == 4
+
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, 40, 200)
+    cols = rng.integers(0, 50, 200)
+    rows[0], cols[0] = -1, 5  # outside of the layer
+    heights = sampler.sampleIndices(rows, cols)
+
+    band = gdal.Open(str(path)).GetRasterBand(1)
+    assert np.isnan(heights[0])
+    for row, col, height in zip(rows[1:], cols[1:], heights[1:]):
+        assert height == band.ReadAsArray(int(col), int(row), 1, 1)[0, 0]
+    assert len(sampler.blocks) > 1
+    assert sampler[3, 45] == band.ReadAsArray(45, 3, 1, 1)[0, 0]
+
+
+def test_getElevationSampler_invalidated(tmp_path):
+    path = tmp_path / "dem.tif"
+    write_elevation_raster(path, 20, 20)
+    dataStorage = SimpleNamespace(elevationSampler=None)
+    layer = RasterLayer("dem", str(path))
+
+    sampler = getElevationSampler(layer, dataStorage)
+    assert getElevationSampler(layer, dataStorage) is sampler
+
+    # another layer
+    other = getElevationSampler(RasterLayer("dem_2", str(path)), dataStorage)
+    assert other is not sampler
+
+    # the source file changed
+    write_elevation_raster(path, 30, 20)
+    assert not other.isValidFor(RasterLayer("dem_2", str(path)))
+    changed = getElevationSampler(RasterLayer("dem_2", str(path)), dataStorage)
+    assert changed is not other
+    assert changed.shape == (20, 30)
+
+    clearElevationSampler(dataStorage)
+    assert dataStorage.elevationSampler is None
+    assert changed.ds is None and len(changed.blocks) == 0
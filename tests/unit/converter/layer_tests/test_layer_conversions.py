@@ -1,3 +1,7 @@
+import numpy as np
+import pytest
+from specklepy.objects import Base
+
 from speckle.converter.layers.layer_conversions import (
     convertSelectedLayersToSpeckle,
     layerToSpeckle,
@@ -14,4 +18,94 @@ from speckle.converter.layers.layer_conversions import (
     addVectorMainThread,
     rasterLayerToNative,
     addRasterMainThread,
+    getRasterGdalType,
+    writeRasterBandValues,
 )
+from speckle.converter.features.feature_conversions import (
+    serialize_raster_band_values,
+)
+
+
+class RasterBand:
+    """Collects the rows written to a GDAL raster band."""
+
+    def __init__(self, x_size, y_size, block_rows=1):
+        self.values = np.zeros((y_size, x_size))
+        self.block_rows = block_rows
+
+    def GetBlockSize(self):
+        return [self.values.shape[1], self.block_rows]
+
+    def WriteArray(self, rows, x_offset, y_offset):
+        self.values[y_offset : y_offset + rows.shape[0], x_offset:] = rows
+
+
+def test_writeRasterBandValues_compact():
+    values = np.arange(-6, 6, dtype=np.int16).reshape(3, 4)
+    feat = Base()
+    feat["@(1)band_values_encoded"] = serialize_raster_band_values(
+        values.reshape(-1), 4, True
+    )
+    band = RasterBand(4, 3)
+    writeRasterBandValues(band, feat, "band", str(values.dtype), np.int16, 4, 3)
+    assert band.values.tolist() == values.tolist()
+
+
+def test_writeRasterBandValues_list():
+    values = np.arange(12, dtype=np.float32).reshape(3, 4)
+    feat = Base()
+    feat["@(10000)band_values"] = serialize_raster_band_values(values.reshape(-1), 4)
+    band = RasterBand(4, 3, block_rows=2)
+    writeRasterBandValues(band, feat, "band", None, np.float32, 4, 3)
+    assert band.values.tolist() == values.tolist()
+
+
+def write_read_encoded_bands(bands: list) -> list:
+    """Write encoded band values to an in-memory GDAL raster, return the values read back."""
+    gdal = pytest.importorskip("osgeo.gdal")
+    gdal_array = pytest.importorskip("osgeo.gdal_array")
+    y_size, x_size = bands[0].shape
+    feat = Base()
+    bandValueTypes = [str(values.dtype) for values in bands]
+    for i, values in enumerate(bands):
+        feat["@(1)band" + str(i) + "_values_encoded"] = serialize_raster_band_values(
+            values.reshape(-1), x_size, True
+        )
+    eType = getRasterGdalType(bandValueTypes)
+    valuesType = gdal_array.GDALTypeCodeToNumericTypeCode(eType)
+    ds = gdal.GetDriverByName("MEM").Create("", x_size, y_size, len(bands), eType)
+    for i in range(len(bands)):
+        writeRasterBandValues(
+            ds.GetRasterBand(i + 1),
+            feat,
+            "band" + str(i),
+            bandValueTypes[i],
+            valuesType,
+            x_size,
+            y_size,
+        )
+    return [ds.GetRasterBand(i + 1).ReadAsArray() for i in range(len(bands))]
+
+
+def test_writeRasterBandValues_native_types():
+    int_band = np.array([[-300, 0, 12], [7, 32000, -1]], dtype=np.int16)
+    byte_band = np.array([[0, 1, 2], [253, 254, 255]], dtype=np.uint8)
+    result = write_read_encoded_bands([int_band, byte_band])
+    assert result[0].dtype == np.int16
+    assert result[0].tolist() == int_band.tolist()
+    assert result[1].tolist() == byte_band.tolist()
+
+
+def test_getRasterGdalType_fallback(monkeypatch):
+    gdal = pytest.importorskip("osgeo.gdal")
+    gdal_array = pytest.importorskip("osgeo.gdal_array")
+    # older GDAL versions have no equivalent of int64 and int8
+    monkeypatch.setattr(
+        gdal_array, "NumericTypeCodeToGDALTypeCode", lambda numeric_type: None
+    )
+    assert getRasterGdalType(["int64"]) == gdal.GDT_Float32
+    assert getRasterGdalType(None) == gdal.GDT_Float32
+    values = np.array([[-2, 0, 5], [1, 2, 3]], dtype=np.int64)
+    result = write_read_encoded_bands([values])
+    assert result[0].dtype == np.float32
+    assert result[0].tolist() == values.tolist()
@@ -3,8 +3,23 @@ from speckle.converter.layers.symbology import (
     gradientColorRampToSpeckle,
     gradientColorRampToNative,
     get_r_g_b,
+    getRangeLookup,
     vectorRendererToNative,
     makeDefaultRenderer,
     rasterRendererToNative,
     rendererToSpeckle,
 )
+
+
+def test_getRangeLookup():
+    lookup = getRangeLookup([(10, 20), (0, 10), (20, 30)])
+    assert lookup(5) == 1
+    assert lookup(10) == 0  # first range in the list wins on the boundary
+    assert lookup(30) == 2
+    assert lookup(-1) is None and lookup(31) is None
+
+
+def test_getRangeLookup_overlapping():
+    lookup = getRangeLookup([(0, 10), (5, 15), (5, 5)])
+    assert lookup(5) == 0
+    assert lookup(12) == 1
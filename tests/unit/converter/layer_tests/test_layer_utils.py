@@ -1,4 +1,13 @@
+from types import SimpleNamespace
+
+import os
+
+import numpy as np
+import pytest
+
+import speckle.converter.layers.utils as layer_utils
 from speckle.converter.layers.utils import (
+    RASTER_OPTIONS_TRANSFORM,
     generate_qgis_app_id,
     generate_qgis_raster_app_id,
     getLayerGeomType,
@@ -7,15 +16,26 @@ from speckle.converter.layers.utils import (
     getLayerAttributes,
     traverseDict,
     validateAttributeName,
+    convertAttributeValue,
+    convertTextAttributeValue,
     trySaveCRS,
     reprojectPt,
     getClosestIndex,
     getArrayIndicesFromXY,
+    getArrayIndicesFromXYArrays,
     getXYofArrayPoint,
     isAppliedLayerTransformByKeywords,
+    parseSavedTransform,
+    addRasterTransformOption,
+    getRasterLayerLod,
+    getRasterLayerSimplifyTolerance,
+    getRasterLodFromOptions,
+    getRasterTransformOptions,
     getElevationLayer,
     get_raster_stats,
     getRasterArrays,
+    encodeRasterBandValues,
+    decodeRasterBandValues,
     moveVertically,
     moveVerticallySegment,
     tryCreateGroupTree,
@@ -24,3 +44,254 @@ from speckle.converter.layers.utils import (
     collectionsFromJson,
     getDisplayValueList,
 )
+
+
+def test_getArrayIndicesFromXYArrays():
+    settings = (1.0, -1.0, 0.0, 10.0, 5, 5, None, None)
+    x = np.array([0.5, 4.9, 5.5, -3.0, 2.0])
+    y = np.array([9.5, 5.1, 9.0, 9.0, 12.0])
+    ind1, ind2 = getArrayIndicesFromXYArrays(settings, x, y)
+    for i in range(len(x)):
+        expected1, expected2, _, _ = getArrayIndicesFromXY(settings, x[i], y[i])
+        assert ind1[i] == (-1 if expected1 is None else expected1)
+        assert ind2[i] == (-1 if expected2 is None else expected2)
+
+
+def test_encodeRasterBandValues():
+    values = np.arange(12, dtype=np.uint8)
+    chunks = encodeRasterBandValues(values, 4)
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    result = decodeRasterBandValues(chunks, str(values.dtype))
+    assert result.dtype == np.uint8
+    assert result.tolist() == values.tolist()
+
+
+def test_encodeRasterBandValues_float_nodata():
+    values = np.array([[1.5, -9999.0, np.nan], [0.0, 2.25, -9999.0]], dtype=np.float32)
+    chunks = encodeRasterBandValues(values, 3)
+    result = decodeRasterBandValues(chunks, str(values.dtype))
+    assert result.dtype == np.float32
+    assert np.array_equal(result, values.reshape(-1), equal_nan=True)
+    assert result[1] == -9999.0 and np.isnan(result[2])
+
+
+def test_getRasterLodFromOptions():
+    assert getRasterLodFromOptions(getRasterTransformOptions("Full resolution")) == (
+        None,
+        False,
+    )
+    assert getRasterLodFromOptions(getRasterTransformOptions("Max 250000 cells")) == (
+        250000,
+        False,
+    )
+    options = getRasterTransformOptions(
+        "Max 50000 cells + Full resolution values + Simplified, tolerance 0.5"
+    )
+    assert getRasterLodFromOptions(options) == (50000, True)
+    assert options["simplify"] == "Simplified, tolerance 0.5"
+    assert getRasterLodFromOptions(getRasterTransformOptions("unknown")) == (
+        None,
+        False,
+    )
+
+
+def test_addRasterTransformOption():
+    attribute = addRasterTransformOption(None, "Simplified, tolerance 2")
+    attribute = addRasterTransformOption(attribute, "Max 250000 cells")
+    assert attribute == "Max 250000 cells + Simplified, tolerance 2"
+    attribute = addRasterTransformOption(attribute, "Max 50000 cells")
+    assert attribute == "Max 50000 cells + Simplified, tolerance 2"
+    attribute = addRasterTransformOption(attribute, "Keep NoData pixels")
+    assert getRasterTransformOptions(attribute)["nodata"] == "Keep NoData pixels"
+
+
+def test_getRasterLayerLod_last_transform():
+    class Layer:
+        def name(self):
+            return "dem"
+
+    dataStorage = SimpleNamespace(
+        savedTransforms=[
+            "dem ('Max 50000 cells')  ->  Elevation to mesh",
+            "dem  ->  Set as elevation layer",
+        ]
+    )
+    assert getRasterLayerLod(Layer(), dataStorage) == (None, False)
+    assert not isAppliedLayerTransformByKeywords(Layer(), ["mesh"], [], dataStorage)
+    dataStorage.savedTransforms.append(
+        "dem ('Max 250000 cells + Simplified, tolerance 2')  ->  Elevation to mesh"
+    )
+    assert getRasterLayerLod(Layer(), dataStorage) == (250000, False)
+    assert getRasterLayerSimplifyTolerance(Layer(), dataStorage) == 2.0
+    assert isAppliedLayerTransformByKeywords(Layer(), ["mesh"], [], dataStorage)
+
+
+def test_getRasterLayerLod_raster_options_transform():
+    class Layer:
+        def name(self):
+            return "ortho"
+
+    dataStorage = SimpleNamespace(
+        savedTransforms=[
+            "ortho ('Max 250000 cells + Full resolution values')  ->  "
+            + RASTER_OPTIONS_TRANSFORM
+        ]
+    )
+    assert getRasterLayerLod(Layer(), dataStorage) == (250000, True)
+    assert not isAppliedLayerTransformByKeywords(
+        Layer(), ["elevation"], [], dataStorage
+    )
+
+
+def test_convertAttributeValue_null():
+    assert convertAttributeValue(None) is None
+    assert convertTextAttributeValue("NULL") is None
+
+
+def test_parseSavedTransform():
+    record = parseSavedTransform(
+        "buildings ('height')  ->  Extrude polygons by selected attribute (ignore if missing)"
+    )
+    assert record["layer_name"] == "buildings"
+    assert record["attribute"] == "height"
+    assert record["ignore"] is True
+    assert "extrude" in record["kind"] and "polygon" in record["kind"]
+    assert parseSavedTransform("dem  ->  Set as elevation layer")["attribute"] is None
+
+
+class Field:
+    def __init__(self, name):
+        self.field_name = name
+
+    def name(self):
+        return self.field_name
+
+
+class VectorLayer:
+    def id(self):
+        return "buildings_1"
+
+    def wkbType(self):
+        return 3
+
+    def fields(self):
+        return [Field("name"), Field("height")]
+
+    def name(self):
+        return "buildings"
+
+
+class Feature:
+    def __init__(self, wkb, attributes):
+        self.wkb = wkb
+        self.attrs = attributes
+
+    def geometry(self):
+        return SimpleNamespace(asWkb=lambda: self.wkb)
+
+    def attributes(self):
+        return self.attrs
+
+
+def test_generate_qgis_app_id_stable():
+    layer = VectorLayer()
+    wkb = b"\x01\x03\x00\x00\x00"
+    app_id = generate_qgis_app_id(layer, Feature(wkb, ["a", 10]))
+    assert len(app_id) == 32
+    assert generate_qgis_app_id(layer, Feature(wkb, ["a", 10])) == app_id
+    prefix = layer_utils.getAppIdPrefix(layer)
+    assert generate_qgis_app_id(layer, Feature(wkb, ["a", 10]), prefix) == app_id
+
+    # changed geometry or attributes
+    changed = [
+        Feature(b"\x01\x03\x00\x00\x01", ["a", 10]),
+        Feature(wkb, ["a", 11]),
+        Feature(wkb, ["a10", ""]),
+    ]
+    for feature in changed:
+        assert generate_qgis_app_id(layer, feature) != app_id
+
+
+class RasterLayer:
+    def __init__(self, source, band_count=1):
+        self.path = source
+        self.band_count = band_count
+
+    def source(self):
+        return self.path
+
+    def bandCount(self):
+        return self.band_count
+
+    def name(self):
+        return os.path.basename(self.path)
+
+
+def write_raster(path, values):
+    gdal = pytest.importorskip("osgeo.gdal")
+    ds = gdal.GetDriverByName("GTiff").Create(
+        str(path), values.shape[1], values.shape[0], 1, gdal.GDT_Float32
+    )
+    ds.SetGeoTransform([100, 1, 0, 200, 0, -1])
+    ds.GetRasterBand(1).WriteArray(values)
+    ds = None
+
+
+def test_generate_qgis_raster_app_id_cache(tmp_path, monkeypatch):
+    pytest.importorskip("osgeo.gdal")
+    monkeypatch.setattr(layer_utils, "_raster_app_id_cache", None)
+    monkeypatch.setattr(layer_utils, "user_speckle_folder_path", lambda: str(tmp_path))
+    blocks_read = []
+    iter_blocks = layer_utils.iterRasterBandBlocks
+    monkeypatch.setattr(
+        layer_utils,
+        "iterRasterBandBlocks",
+        lambda band: blocks_read.append(band) or iter_blocks(band),
+    )
+    path = tmp_path / "ortho.tif"
+    write_raster(path, np.zeros((4, 5), dtype=np.float32))
+    layer = RasterLayer(str(path))
+
+    app_id = generate_qgis_raster_app_id(layer)
+    assert app_id != "" and len(blocks_read) == 1
+    assert os.path.isfile(tmp_path / layer_utils.RASTER_APP_ID_CACHE_FILE)
+
+    # cache hit: the band values are not read again
+    assert generate_qgis_raster_app_id(layer) == app_id
+    assert len(blocks_read) == 1
+
+    # cache miss after the file changed
+    write_raster(path, np.ones((4, 5), dtype=np.float32))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000000000))
+    changed_id = generate_qgis_raster_app_id(layer)
+    assert changed_id != app_id and len(blocks_read) == 2
+
+
+def test_get_raster_stats_cache(tmp_path, monkeypatch):
+    gdal = pytest.importorskip("osgeo.gdal")
+    pytest.importorskip("qgis.core")
+    monkeypatch.setattr(layer_utils, "_raster_stats_cache", {})
+    opened = []
+    gdal_open = gdal.Open
+    monkeypatch.setattr(
+        layer_utils.gdal, "Open", lambda *args: opened.append(args) or gdal_open(*args)
+    )
+    path = tmp_path / "dem.tif"
+    write_raster(path, np.zeros((4, 5), dtype=np.float32))
+    layer = RasterLayer(str(path))
+
+    stats = get_raster_stats(layer)
+    assert stats[:6] == (1.0, -1.0, 100, 200, 5, 4)
+    assert get_raster_stats(layer) == stats
+    assert len(opened) == 1
+
+    # recomputed after the modification time changed
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000000000))
+    assert get_raster_stats(layer) == stats
+    assert len(opened) == 2
+
+    # recomputed after the size changed
+    write_raster(path, np.zeros((6, 8), dtype=np.float32))
+    assert get_raster_stats(layer)[4:6] == (8, 6)
+    assert len(opened) == 3
+    assert len(layer_utils._raster_stats_cache) == 1
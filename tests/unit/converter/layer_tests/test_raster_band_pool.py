@@ -0,0 +1,38 @@
+import time
+
+from speckle.converter.layers.RasterBandPool import (
+    RASTER_READ_THREADS,
+    RasterBandPool,
+)
+
+
+class Dataset:
+    def GetRasterBand(self, index):
+        return index
+
+
+class BandPool(RasterBandPool):
+    """Band pool over a dataset that returns the band number as the band."""
+
+    def getDataset(self):
+        return Dataset()
+
+
+def test_map_band_order():
+    band_count = min(4, RASTER_READ_THREADS)
+    finished = []
+
+    def read(band, index):
+        # reads finish in the reverse band order
+        deadline = time.time() + 5
+        while len(finished) < band_count - 1 - index and time.time() < deadline:
+            time.sleep(0.001)
+        finished.append(index)
+        return band * 10
+
+    with BandPool("raster.tif", band_count) as pool:
+        assert pool.executor is not None
+        result = pool.map(read)
+    assert finished == list(reversed(range(band_count)))
+    assert result == [(index + 1) * 10 for index in range(band_count)]
+    assert pool.executor is None
@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from speckle.utils.project_vars import (
     get_project_streams,
     set_project_streams,
@@ -15,3 +17,66 @@ from speckle.utils.project_vars import (
     set_elevationLayer,
     setProjectReferenceSystem,
 )
+from speckle.converter.layers.utils import getLayerTransforms
+
+
+class Project:
+    def __init__(self):
+        self.entries = {}
+
+    def writeEntry(self, scope, key, value):
+        self.entries[(scope, key)] = value
+
+    def readEntry(self, scope, key, default):
+        if (scope, key) in self.entries:
+            return self.entries[(scope, key)], True
+        return default, False
+
+
+def test_transformations_raster_options_round_trip():
+    savedTransforms = [
+        "dem ('Max 250000 cells + Full resolution values + Simplified, tolerance 2')  ->  Elevation to mesh",
+        "buildings ('height')  ->  Extrude polygons by selected attribute",
+    ]
+    project = Project()
+    set_transformations(
+        SimpleNamespace(project=project, savedTransforms=list(savedTransforms))
+    )
+    dataStorage = SimpleNamespace(project=project, savedTransforms=[])
+    get_transformations(dataStorage)
+    assert dataStorage.savedTransforms == savedTransforms
+
+    class Layer:
+        def name(self):
+            return "dem"
+
+    options = getLayerTransforms(Layer(), dataStorage)[-1]["options"]
+    assert options == {
+        "lod": "Max 250000 cells",
+        "values": "Full resolution values",
+        "simplify": "Simplified, tolerance 2",
+    }
+
+
+def test_transformations_raster_mesh_options_round_trip():
+    savedTransforms = [
+        "ortho ('Max 50000 cells + Separate pixel vertices + Keep NoData pixels')  ->  Elevation to texture",
+    ]
+    project = Project()
+    set_transformations(
+        SimpleNamespace(project=project, savedTransforms=list(savedTransforms))
+    )
+    dataStorage = SimpleNamespace(project=project, savedTransforms=[])
+    get_transformations(dataStorage)
+    assert dataStorage.savedTransforms == savedTransforms
+
+    class Layer:
+        def name(self):
+            return "ortho"
+
+    options = getLayerTransforms(Layer(), dataStorage)[-1]["options"]
+    assert options == {
+        "lod": "Max 50000 cells",
+        "vertices": "Separate pixel vertices",
+        "nodata": "Keep NoData pixels",
+    }